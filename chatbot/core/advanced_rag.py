@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import json
@@ -9,6 +10,8 @@ from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
 from .schemas import RAGResult, ConversationContext, IntentResult
 from .config import config
+from .llm_cache import cached_embedding
+from .llm_client import get_shared_openai_client
 # REMOVED: Complex context-aware imports that were causing issues
 # from .context_manager import ContextAwareQueryEnhancer
 # from .context_aware_retriever import ContextAwareDocumentRetriever
@@ -278,18 +281,9 @@ class MultiQueryRetriever:
         
         logger.info(f"     🧠 RAG SYSTEM: Getting embedding for query: '{query[:50]}...'")
         try:
-            from openai import AsyncOpenAI
-            embedding_model = AsyncOpenAI(
-                api_key=config.openai_api_key
-            )
-            
-            logger.info(f"       Calling OpenAI embeddings API...")
-            response = await embedding_model.embeddings.create(
-                model=config.embedding_model,
-                input=query
-            )
-            
-            embedding = response.data[0].embedding
+            # Shared cache dedups against the intent and response-cache
+            # embeddings of the same message (and repeat retrievals)
+            embedding = await cached_embedding(get_shared_openai_client(), query)
             logger.info(f"       ✅ Embedding received successfully, length: {len(embedding)}")
             return embedding
             
@@ -451,6 +445,7 @@ class EnhancedRAGSystem:
     
     async def get_semantic_response(self, query: str, context: ConversationContext, intent_result: IntentResult = None, needs_external_search: bool = None) -> RAGResult:
         """Get semantic response using RAG with proper multi-query retrieval"""
+        search_task = None
         try:
             logger.info(f"🔍 RAG SYSTEM: Starting semantic response generation for query: '{query[:100]}...'")
             
@@ -465,6 +460,17 @@ class EnhancedRAGSystem:
             #     logger.error(f"🔍 RAG SYSTEM: Error in query enhancement: {e}") # REMOVED: Simple context system
             #     # Continue with original query if enhancement fails # REMOVED: Simple context system
             
+            # Kick off external search before retrieval when we already know it
+            # will be needed - the Tavily round-trip then overlaps document
+            # retrieval and response generation instead of running after them
+            should_search = needs_external_search and self.external_search_system
+            search_task = None
+            if should_search and config.speculative_search:
+                logger.info("🔍 RAG SYSTEM: Launching speculative external search alongside RAG")
+                search_task = asyncio.ensure_future(
+                    self.external_search_system.search_with_evaluation(query, context, needs_external_search=True)
+                )
+
             # CRITICAL FIX: Use MultiQueryRetriever for comprehensive document retrieval
             # This ensures we get all relevant documents in a single call instead of multiple calls
             logger.info("🔍 RAG SYSTEM: Using MultiQueryRetriever for comprehensive document retrieval")
@@ -476,6 +482,8 @@ class EnhancedRAGSystem:
             
             if not documents:
                 logger.warning("🔍 RAG SYSTEM: No documents retrieved, using fallback response")
+                if search_task is not None:
+                    search_task.cancel()
                 fallback_response = self._get_fallback_response([], query, context)
                 return RAGResult(
                     response=fallback_response,
@@ -497,15 +505,12 @@ class EnhancedRAGSystem:
             
             # SIMPLIFIED: Basic external search logic
             # The external search system handles its own caching and deduplication
-            
-            # SIMPLIFIED: Basic external search logic
-            should_search = needs_external_search and self.external_search_system
             if should_search:
                 logger.info("🔍 RAG SYSTEM: External search supplementation requested")
-                
+
                 try:
-                    supplemented_response, search_result = await self._supplement_with_external_search(query, rag_response, context, intent_result, should_search)
-                    
+                    supplemented_response, search_result = await self._supplement_with_external_search(query, rag_response, context, intent_result, should_search, search_task=search_task)
+
                     if supplemented_response != rag_response:
                         logger.info("🔍 RAG SYSTEM: Response supplemented with external search")
                         rag_response = supplemented_response
@@ -519,7 +524,13 @@ class EnhancedRAGSystem:
                     # Continue without external search if it fails
             else:
                 logger.info("🔍 RAG SYSTEM: No external search supplementation needed")
-            
+
+            # Supplementation normally consumes the speculative task; make sure
+            # an unconsumed one (early skip or error) doesn't keep running
+            if search_task is not None and not search_task.done():
+                search_task.cancel()
+
+
             # Evaluate response quality
             quality_score = await self._evaluate_response_quality(query, rag_response, documents, context)
             logger.info(f"🔍 RAG SYSTEM: Response quality evaluation: {quality_score:.3f}")
@@ -545,6 +556,8 @@ class EnhancedRAGSystem:
             
         except Exception as e:
             logger.error(f"🔍 RAG SYSTEM: Error in semantic response generation: {e}")
+            if search_task is not None and not search_task.done():
+                search_task.cancel()
             # Return fallback response
             fallback_response = self._get_fallback_response([], query, context)
             return RAGResult(
@@ -1056,7 +1069,7 @@ You are a knowledgeable financial advisor assistant having a natural conversatio
             logger.error(f"Error storing chunks in Qdrant: {e}")
             raise 
 
-    async def _supplement_with_external_search(self, query: str, rag_response: str, context: ConversationContext, intent_result: IntentResult = None, needs_external_search: bool = None) -> tuple[str, Any]:
+    async def _supplement_with_external_search(self, query: str, rag_response: str, context: ConversationContext, intent_result: IntentResult = None, needs_external_search: bool = None, search_task: Optional[asyncio.Task] = None) -> tuple[str, Any]:
         """Supplement RAG response with external search if needed and valuable"""
         try:
             logger.info("🔍 Checking if external search supplementation is needed...")
@@ -1095,8 +1108,12 @@ You are a knowledgeable financial advisor assistant having a natural conversatio
                 logger.warning("   External search system not available - skipping supplementation")
                 return rag_response, None
             
-            # Perform external search
-            search_result = await self.external_search_system.search_with_evaluation(query, context, needs_external_search=should_search)
+            # Perform external search - consume the speculative task when the
+            # caller already launched one so the round-trip isn't paid twice
+            if search_task is not None:
+                search_result = await search_task
+            else:
+                search_result = await self.external_search_system.search_with_evaluation(query, context, needs_external_search=should_search)
             
             if not search_result or search_result.quality_score < config.min_search_confidence:
                 logger.info(f"   External search quality below threshold ({search_result.quality_score if search_result else 'N/A'} < {config.min_search_confidence})")
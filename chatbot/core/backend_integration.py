@@ -4,109 +4,137 @@ Handles communication with the portfolio analysis backend.
 """
 
 import asyncio
+import gzip
 import logging
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 import httpx
+import msgpack
+import orjson
 from .schemas import ConversationContext
 from .config import config
 
 logger = logging.getLogger(__name__)
 
+# Only bother compressing CSV payloads above this size - smaller bodies cost more to gzip than to send
+COMPRESSION_MIN_BYTES = 4096
+
 class BackendAPIIntegrator:
     """Integrates with existing backend APIs for calculations and analysis"""
-    
+
+    __slots__ = ("base_url", "client", "_use_msgpack")
+
+    # Every backend call is the same POST-json/check-200 shape; route them through one helper
+    _ROUTES = {
+        "calculate_quick": "/api/calculate-needs-quick",
+        "calculate_detailed": "/api/calculate-needs-detailed",
+        "portfolio": "/api/portfolio/analyze",
+        "csv": "/api/portfolio/process-csv",
+        "assess": "/api/client/assess"
+    }
+
     def __init__(self):
         self.base_url = "http://localhost:8000"  # Backend API base URL
-        self.client = httpx.AsyncClient(timeout=30.0)
-    
-    async def calculate_life_insurance_needs(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate life insurance needs using the backend API"""
-        
+        self.client = httpx.AsyncClient(
+            timeout=30.0,
+            headers={"Accept-Encoding": "gzip, deflate"}  # Large analysis responses compress well on loopback
+        )
+        # msgpack is smaller and faster to parse than JSON on loopback; disabled
+        # the first time the backend rejects a msgpack body
+        self._use_msgpack = True
+
+    async def _post(self, route: str, data: Dict[str, Any], error_label: str) -> Dict[str, Any]:
+        """Shared POST helper: serialize, call the backend, and normalize errors"""
+
+        url = f"{self.base_url}{self._ROUTES[route]}"
+
         try:
-            # Determine which endpoint to use based on data complexity
-            if len(data) <= 6 and "calculation_type" in data:
-                # Simple chatbot calculation - use quick endpoint
-                endpoint = "http://localhost:8000/api/calculate-needs-quick"
-                print(f"Using quick endpoint for chatbot calculation: {endpoint}")
-            else:
-                # Complex calculation - use detailed endpoint
-                endpoint = "http://localhost:8000/api/calculate-needs-detailed"
-                print(f"Using detailed endpoint for complex calculation: {endpoint}")
-            
-            # Call the backend API endpoint
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    endpoint,
-                    json=data,
-                    timeout=30.0
+            if self._use_msgpack:
+                response = await self.client.post(
+                    url,
+                    content=msgpack.packb(data),
+                    headers={
+                        "Content-Type": "application/msgpack",
+                        "Accept": "application/msgpack"
+                    }
                 )
-                
                 if response.status_code == 200:
-                    return response.json()
-                else:
-                    return {"error": f"Backend API error: {response.status_code}"}
-                    
-        except Exception as e:
-            logger.error(f"Error calling backend API: {e}")
-            return {"error": f"API call failed: {str(e)}"}
-    
-    async def analyze_portfolio(self, portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze portfolio using existing backend API"""
-        
-        try:
+                    if response.headers.get("content-type", "").startswith("application/msgpack"):
+                        return msgpack.unpackb(response.content, raw=False)
+                    return orjson.loads(response.content)
+                # Backends without msgpack support reject the body however they
+                # like (415, 422, 500...) - remember and retry as JSON
+                logger.warning("%s msgpack request rejected (%s); retrying as JSON",
+                               error_label, response.status_code)
+                self._use_msgpack = False
+
             response = await self.client.post(
-                f"{self.base_url}/api/portfolio/analyze",
-                json=portfolio_data
+                url,
+                content=orjson.dumps(data),
+                headers={"Content-Type": "application/json"}
             )
-            
+
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             else:
-                logger.error(f"Portfolio analysis failed: {response.status_code}")
-                return {"error": "Analysis failed", "status_code": response.status_code}
-                
-        except Exception as e:
-            logger.error(f"Error calling portfolio API: {e}")
+                logger.error("%s failed: %s", error_label, response.status_code)
+                return {"error": f"{error_label} failed", "status_code": response.status_code}
+
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            logger.error("%s call failed: %s", error_label, e)
             return {"error": f"API call failed: {str(e)}"}
-    
+
+    async def calculate_life_insurance_needs(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Calculate life insurance needs using the backend API"""
+
+        # Determine which endpoint to use based on data complexity
+        if len(data) <= 6 and "calculation_type" in data:
+            # Simple chatbot calculation - use quick endpoint
+            route = "calculate_quick"
+        else:
+            # Complex calculation - use detailed endpoint
+            route = "calculate_detailed"
+
+        return await self._post(route, data, "Needs calculation")
+
+    async def analyze_portfolio(self, portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze portfolio using existing backend API"""
+
+        return await self._post("portfolio", portfolio_data, "Portfolio analysis")
+
     async def process_csv_data(self, csv_data: str) -> Dict[str, Any]:
         """Process CSV data using existing backend API"""
-        
-        try:
-            response = await self.client.post(
-                f"{self.base_url}/api/portfolio/process-csv",
-                json={"csv_data": csv_data}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"CSV processing failed: {response.status_code}")
-                return {"error": "Processing failed", "status_code": response.status_code}
-                
-        except Exception as e:
-            logger.error(f"Error calling CSV processing API: {e}")
-            return {"error": f"API call failed: {str(e)}"}
-    
+
+        # Large CSVs get the gzip fast path; everything else goes through the shared helper
+        body = csv_data.encode("utf-8")
+        if len(body) >= COMPRESSION_MIN_BYTES:
+            try:
+                response = await self.client.post(
+                    f"{self.base_url}{self._ROUTES['csv']}",
+                    content=gzip.compress(body),
+                    headers={
+                        "Content-Encoding": "gzip",
+                        "Content-Type": "text/csv"
+                    }
+                )
+                if response.status_code == 200:
+                    return orjson.loads(response.content)
+                # Backend versions without gzip request support reject the
+                # encoding however they like (400, 415, 422, 500...) - fall
+                # back to the uncompressed path below on any failure
+                logger.warning("Gzipped CSV upload rejected (%s); retrying uncompressed",
+                               response.status_code)
+            except (httpx.HTTPError, asyncio.TimeoutError) as e:
+                logger.error("CSV processing call failed: %s", e)
+                return {"error": f"API call failed: {str(e)}"}
+
+        return await self._post("csv", {"csv_data": csv_data}, "CSV processing")
+
     async def get_client_assessment(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
         """Get client assessment using existing backend API"""
-        
-        try:
-            response = await self.client.post(
-                f"{self.base_url}/api/client/assess",
-                json=client_data
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"Client assessment failed: {response.status_code}")
-                return {"error": "Assessment failed", "status_code": response.status_code}
-                
-        except Exception as e:
-            logger.error(f"Error calling client assessment API: {e}")
-            return {"error": f"API call failed: {str(e)}"}
-    
+
+        return await self._post("assess", client_data, "Client assessment")
+
     async def close(self):
         """Close the HTTP client"""
         
@@ -114,170 +142,164 @@ class BackendAPIIntegrator:
 
 class LifeInsuranceCalculator:
     """Enhanced life insurance calculator using existing backend APIs"""
-    
+
+    __slots__ = ("backend",)
+
     def __init__(self, backend_integrator: BackendAPIIntegrator):
         self.backend = backend_integrator
     
     async def calculate_quick_needs(self, age: int, income: float, dependents: int, debt: float, goals: str) -> Dict[str, Any]:
         """Calculate quick insurance needs estimate"""
+
+        # Reject invalid inputs before spending a round-trip on the backend
+        validation_error = self._validate_quick_inputs(age, income, dependents, debt)
+        if validation_error:
+            return {"error": validation_error}
+
+        # Prepare data for backend API
+        calculation_data = {
+            "age": age,
+            "annual_income": income,
+            "dependents": dependents,
+            "total_debt": debt,
+            "financial_goals": goals,
+            "calculation_type": "quick_estimate"
+        }
         
-        try:
-            # Prepare data for backend API
-            calculation_data = {
-                "age": age,
-                "annual_income": income,
-                "dependents": dependents,
-                "total_debt": debt,
-                "financial_goals": goals,
-                "calculation_type": "quick_estimate"
+        # Call backend API
+        result = await self.backend.calculate_life_insurance_needs(calculation_data)
+        
+        if "error" not in result:
+            return {
+                "status": "success",
+                "recommended_coverage": result.get("recommended_coverage", 0),
+                "monthly_premium_estimate": result.get("monthly_premium_estimate", 0),
+                "calculation_method": result.get("calculation_method", "DIME + Income Replacement"),
+                "key_factors": result.get("key_factors", []),
+                "next_steps": result.get("next_steps", [])
             }
-            
-            # Call backend API
-            result = await self.backend.calculate_life_insurance_needs(calculation_data)
-            
-            if "error" not in result:
-                return {
-                    "status": "success",
-                    "recommended_coverage": result.get("recommended_coverage", 0),
-                    "monthly_premium_estimate": result.get("monthly_premium_estimate", 0),
-                    "calculation_method": result.get("calculation_method", "DIME + Income Replacement"),
-                    "key_factors": result.get("key_factors", []),
-                    "next_steps": result.get("next_steps", [])
-                }
-            else:
-                return result
-                
-        except Exception as e:
-            logger.error(f"Error in quick needs calculation: {e}")
-            return {"error": f"Calculation failed: {str(e)}"}
-    
+        else:
+            return result
+
+    def _validate_quick_inputs(self, age: int, income: float, dependents: int, debt: float) -> Optional[str]:
+        """Validate quick-calculation inputs, returning an error message for out-of-range values"""
+
+        if age < 0 or age > 120:
+            return f"Invalid age: {age}. Age must be between 0 and 120."
+        if income < 0:
+            return f"Invalid income: {income}. Income cannot be negative."
+        if dependents < 0:
+            return f"Invalid dependents: {dependents}. Dependents cannot be negative."
+        if debt < 0:
+            return f"Invalid debt: {debt}. Debt cannot be negative."
+        return None
+
     async def calculate_detailed_needs(self, comprehensive_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate detailed insurance needs using comprehensive data"""
         
-        try:
-            # Add calculation type
-            comprehensive_data["calculation_type"] = "detailed_analysis"
-            
-            # Call backend API
-            result = await self.backend.calculate_life_insurance_needs(comprehensive_data)
-            
-            if "error" not in result:
-                return {
-                    "status": "success",
-                    "detailed_analysis": result,
-                    "recommendations": result.get("recommendations", []),
-                    "risk_assessment": result.get("risk_assessment", {}),
-                    "product_recommendations": result.get("product_recommendations", [])
-                }
-            else:
-                return result
-                
-        except Exception as e:
-            logger.error(f"Error in detailed needs calculation: {e}")
-            return {"error": f"Calculation failed: {str(e)}"}
+        # Add calculation type
+        comprehensive_data["calculation_type"] = "detailed_analysis"
+        
+        # Call backend API
+        result = await self.backend.calculate_life_insurance_needs(comprehensive_data)
+        
+        if "error" not in result:
+            return {
+                "status": "success",
+                "detailed_analysis": result,
+                "recommendations": result.get("recommendations", []),
+                "risk_assessment": result.get("risk_assessment", {}),
+                "product_recommendations": result.get("product_recommendations", [])
+            }
+        else:
+            return result
+
 
 class PortfolioAnalyzer:
     """Portfolio analyzer using existing backend APIs"""
-    
+
+    __slots__ = ("backend",)
+
     def __init__(self, backend_integrator: BackendAPIIntegrator):
         self.backend = backend_integrator
     
     async def analyze_portfolio_comprehensive(self, portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform comprehensive portfolio analysis"""
         
-        try:
-            # Call backend API
-            result = await self.backend.analyze_portfolio(portfolio_data)
-            
-            if "error" not in result:
-                return {
-                    "status": "success",
-                    "portfolio_analysis": result,
-                    "risk_assessment": result.get("risk_assessment", {}),
-                    "recommendations": result.get("recommendations", []),
-                    "insurance_implications": result.get("insurance_implications", {})
-                }
-            else:
-                return result
-                
-        except Exception as e:
-            logger.error(f"Error in portfolio analysis: {e}")
-            return {"error": f"Analysis failed: {str(e)}"}
+        # Call backend API
+        result = await self.backend.analyze_portfolio(portfolio_data)
+        
+        if "error" not in result:
+            return {
+                "status": "success",
+                "portfolio_analysis": result,
+                "risk_assessment": result.get("risk_assessment", {}),
+                "recommendations": result.get("recommendations", []),
+                "insurance_implications": result.get("insurance_implications", {})
+            }
+        else:
+            return result
     
     async def process_portfolio_csv(self, csv_data: str) -> Dict[str, Any]:
         """Process portfolio CSV data"""
         
-        try:
-            # Call backend API
-            result = await self.backend.process_csv_data(csv_data)
-            
-            if "error" not in result:
-                return {
-                    "status": "success",
-                    "processed_data": result,
-                    "portfolio_summary": result.get("portfolio_summary", {}),
-                    "analysis_ready": result.get("analysis_ready", False)
-                }
-            else:
-                return result
-                
-        except Exception as e:
-            logger.error(f"Error processing portfolio CSV: {e}")
-            return {"error": f"Processing failed: {str(e)}"}
+        # Call backend API
+        result = await self.backend.process_csv_data(csv_data)
+        
+        if "error" not in result:
+            return {
+                "status": "success",
+                "processed_data": result,
+                "portfolio_summary": result.get("portfolio_summary", {}),
+                "analysis_ready": result.get("analysis_ready", False)
+            }
+        else:
+            return result
+
 
 class ClientAssessmentManager:
     """Manages client assessments using existing backend APIs"""
-    
+
+    __slots__ = ("backend",)
+
     def __init__(self, backend_integrator: BackendAPIIntegrator):
         self.backend = backend_integrator
     
     async def perform_client_assessment(self, client_data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform comprehensive client assessment"""
         
-        try:
-            # Call backend API
-            result = await self.backend.get_client_assessment(client_data)
-            
-            if "error" not in result:
-                return {
-                    "status": "success",
-                    "assessment_results": result,
-                    "client_profile": result.get("client_profile", {}),
-                    "recommendations": result.get("recommendations", []),
-                    "next_steps": result.get("next_steps", [])
-                }
-            else:
-                return result
-                
-        except Exception as e:
-            logger.error(f"Error in client assessment: {e}")
-            return {"error": f"Assessment failed: {str(e)}"}
-    
-    async def generate_assessment_report(self, assessment_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate comprehensive assessment report"""
+        # Call backend API
+        result = await self.backend.get_client_assessment(client_data)
         
-        try:
-            # This would typically call a report generation service
-            # For now, we'll format the assessment data
-            report = {
-                "report_id": f"ASSESS_{assessment_data.get('client_id', 'UNKNOWN')}_{int(datetime.now().timestamp())}",
-                "generated_at": datetime.now().isoformat(),
-                "client_summary": assessment_data.get("client_profile", {}),
-                "assessment_findings": assessment_data.get("assessment_results", {}),
-                "recommendations": assessment_data.get("recommendations", []),
-                "action_items": assessment_data.get("next_steps", []),
-                "report_type": "comprehensive_client_assessment"
-            }
-            
+        if "error" not in result:
             return {
                 "status": "success",
-                "report": report,
-                "download_url": f"/reports/{report['report_id']}.pdf"  # Placeholder
+                "assessment_results": result,
+                "client_profile": result.get("client_profile", {}),
+                "recommendations": result.get("recommendations", []),
+                "next_steps": result.get("next_steps", [])
             }
-            
-        except Exception as e:
-            logger.error(f"Error generating assessment report: {e}")
-            return {"error": f"Report generation failed: {str(e)}"}
-
-# Import datetime for report generation
-from datetime import datetime 
\ No newline at end of file
+        else:
+            return result
+    
+    async def generate_assessment_report(self, assessment_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate comprehensive assessment report"""
+        
+        # This would typically call a report generation service
+        # For now, we'll format the assessment data
+        now = datetime.now()
+        report = {
+            "report_id": f"ASSESS_{assessment_data.get('client_id', 'UNKNOWN')}_{int(now.timestamp())}",
+            "generated_at": now.isoformat(),
+            "client_summary": assessment_data.get("client_profile", {}),
+            "assessment_findings": assessment_data.get("assessment_results", {}),
+            "recommendations": assessment_data.get("recommendations", []),
+            "action_items": assessment_data.get("next_steps", []),
+            "report_type": "comprehensive_client_assessment"
+        }
+        
+        return {
+            "status": "success",
+            "report": report,
+            "download_url": f"/reports/{report['report_id']}.pdf"  # Placeholder
+        }
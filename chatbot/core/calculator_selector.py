@@ -1,54 +1,32 @@
 import logging
-import json
+import re
+from collections import Counter
 from typing import List, Dict, Any, Optional
+import orjson
 from openai import AsyncOpenAI
 from .schemas import CalculatorSelection, CalculatorType, ConversationContext, KnowledgeLevel
 from .config import config
+from .llm_client import get_shared_openai_client
 
 logger = logging.getLogger(__name__)
 
-class SemanticCalculatorSelector:
-    """Uses semantic understanding to select the right calculator"""
-    
-    def __init__(self):
-        self.llm = AsyncOpenAI(
-            api_key=config.openai_api_key
-        )
-    
-    async def select_calculator_semantically(self, query: str, context: ConversationContext) -> CalculatorSelection:
-        """Understand user's semantic intent to select appropriate calculator"""
-        
-        try:
-            # Validate that this query actually needs a calculator
-            if not self._needs_calculator(query):
-                logger.warning(f"Calculator selector called for non-calculation query: {query}")
-                return self._get_fallback_calculator_selection(query, context)
-            
-            prompt = self._build_calculator_selection_prompt(query, context)
-            
-            response = await self.llm.chat.completions.create(
-                model=config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1
-            )
-            
-            selection_data = self._parse_calculator_selection(response.choices[0].message.content)
-            
-            # Validate the selection
-            validated_selection = self._validate_calculator_selection(selection_data, context)
-            
-            logger.info(f"Calculator selection: {validated_selection.selected_calculator} with confidence {validated_selection.confidence}")
-            
-            return validated_selection
-            
-        except Exception as e:
-            logger.error(f"Error in calculator selection: {e}")
-            return self._get_fallback_calculator_selection(query, context)
-    
-    def _build_calculator_selection_prompt(self, query: str, context: ConversationContext) -> str:
-        """Build comprehensive prompt for calculator selection"""
-        
-        return f"""
+# Fallback keyword -> calculator map compiled into one regex union at import so
+# classification is a single linear scan instead of repeated substring loops
+_FALLBACK_KEYWORDS = {
+    "quick": CalculatorType.QUICK,
+    "fast": CalculatorType.QUICK,
+    "estimate": CalculatorType.QUICK,
+    "basic": CalculatorType.QUICK,
+    "simple": CalculatorType.QUICK,
+    "portfolio": CalculatorType.PORTFOLIO,
+    "investment": CalculatorType.PORTFOLIO,
+    "asset": CalculatorType.PORTFOLIO,
+    "allocation": CalculatorType.PORTFOLIO
+}
+_FALLBACK_PATTERN = re.compile("|".join(re.escape(kw) for kw in _FALLBACK_KEYWORDS))
+
+# Static selection prompt compiled once at import; only five small values vary per call
+_CALCULATOR_SELECTION_PROMPT = """
         IMPORTANT: This calculator selector should ONLY be called when the user explicitly needs a calculation or insurance needs assessment.
         
         Analyze this request semantically to determine which calculator best serves the user's needs:
@@ -56,10 +34,10 @@ class SemanticCalculatorSelector:
         **User Request:** "{query}"
         
         **Conversation Context:**
-        - User's knowledge level: {context.knowledge_level.value}
-        - Previous questions: {', '.join(context.semantic_themes) if context.semantic_themes else 'None'}
-        - Expressed goals: {', '.join(context.user_goals) if context.user_goals else 'None'}
-        - Current focus area: {context.current_topic or 'General'}
+        - User's knowledge level: {knowledge_level}
+        - Previous questions: {themes}
+        - Expressed goals: {goals}
+        - Current focus area: {topic}
         
         **Calculator Options:**
         1. **Quick Calculator**: 5 basic questions, immediate estimate
@@ -97,18 +75,6 @@ class SemanticCalculatorSelector:
         - Intermediate: May prefer Detailed Calculator for comprehensive planning
         - Expert: Could use any calculator based on specific needs
         
-        **Response Format:**
-        Return ONLY a valid JSON object with this exact structure:
-        {{
-            "selected_calculator": "quick|detailed|portfolio",
-            "confidence": 0.95,
-            "semantic_reasoning": "detailed explanation of why this calculator matches their intent",
-            "clarification_questions": ["question1", "question2", "question3"],
-            "expected_outcome": "what they'll get from this calculator",
-            "time_estimate": "estimated time to complete",
-            "complexity_level": "simple|moderate|complex"
-        }}
-        
         **Important:**
         - Focus on semantic meaning, not surface-level words
         - Consider the user's knowledge level and goals
@@ -116,22 +82,105 @@ class SemanticCalculatorSelector:
         - Include relevant clarification questions
         - Be precise about expected outcomes
         """
+
+# Strict schema enforced server-side via structured outputs - the response is
+# guaranteed valid JSON, so no format scaffolding in the prompt and no
+# code-fence stripping in the parser
+_SELECTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "calculator_selection",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "selected_calculator": {"type": "string", "enum": ["quick", "detailed", "portfolio"]},
+                "confidence": {"type": "number"},
+                "semantic_reasoning": {"type": "string"},
+                "clarification_questions": {"type": "array", "items": {"type": "string"}},
+                "expected_outcome": {"type": "string"},
+                "time_estimate": {"type": "string"},
+                "complexity_level": {"type": "string", "enum": ["simple", "moderate", "complex"]}
+            },
+            "required": [
+                "selected_calculator", "confidence", "semantic_reasoning",
+                "clarification_questions", "expected_outcome", "time_estimate",
+                "complexity_level"
+            ],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+class SemanticCalculatorSelector:
+    """Uses semantic understanding to select the right calculator"""
+
+    __slots__ = ("_llm",)
+
+    def __init__(self):
+        self._llm = None
+
+    @property
+    def llm(self) -> AsyncOpenAI:
+        """Lazily bind the shared OpenAI client so selectors that never call the LLM don't pay for it"""
+        if self._llm is None:
+            self._llm = get_shared_openai_client()
+        return self._llm
+
+    async def select_calculator_semantically(self, query: str, context: ConversationContext) -> CalculatorSelection:
+        """Understand user's semantic intent to select appropriate calculator"""
+        
+        try:
+            # Empty/near-empty queries can't be classified - skip the LLM round-trip entirely
+            if len(query.strip()) < 3:
+                return self._get_fallback_calculator_selection(query, context)
+
+            # Validate that this query actually needs a calculator
+            if not self._needs_calculator(query):
+                logger.warning("Calculator selector called for non-calculation query: %s", query)
+                return self._get_fallback_calculator_selection(query, context)
+            
+            prompt = self._build_calculator_selection_prompt(query, context)
+            
+            response = await self.llm.chat.completions.create(
+                model=config.openai_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+                response_format=_SELECTION_RESPONSE_FORMAT
+            )
+            
+            selection_data = self._parse_calculator_selection(response.choices[0].message.content)
+            
+            # Validate the selection
+            validated_selection = self._validate_calculator_selection(selection_data, context)
+            
+            logger.info("Calculator selection: %s with confidence %s", validated_selection.selected_calculator, validated_selection.confidence)
+            
+            return validated_selection
+            
+        except Exception as e:
+            logger.error("Error in calculator selection: %s", e)
+            return self._get_fallback_calculator_selection(query, context)
+    
+    def _build_calculator_selection_prompt(self, query: str, context: ConversationContext) -> str:
+        """Build comprehensive prompt for calculator selection"""
+        
+        return _CALCULATOR_SELECTION_PROMPT.format_map({
+            "query": query,
+            "knowledge_level": context.knowledge_level.value,
+            "themes": ', '.join(context.semantic_themes) if context.semantic_themes else 'None',
+            "goals": ', '.join(context.user_goals) if context.user_goals else 'None',
+            "topic": context.current_topic or 'General'
+        })
     
     def _parse_calculator_selection(self, response: str) -> Dict[str, Any]:
         """Parse the LLM response into calculator selection data"""
         
         try:
-            # Clean response and extract JSON
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.endswith("```"):
-                response = response[:-3]
-            
-            response = response.strip()
-            
-            # Parse JSON
-            selection_data = json.loads(response)
+            # Structured output guarantees a bare JSON object - no fence stripping needed
+            # (orjson is several times faster than stdlib json on these payloads)
+            selection_data = orjson.loads(response)
             
             # Validate required fields
             required_fields = ["selected_calculator", "confidence", "semantic_reasoning", "expected_outcome"]
@@ -141,9 +190,9 @@ class SemanticCalculatorSelector:
             
             return selection_data
             
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            logger.error(f"Error parsing calculator selection: {e}")
-            logger.error(f"Raw response: {response}")
+        except (orjson.JSONDecodeError, KeyError, ValueError) as e:
+            logger.error("Error parsing calculator selection: %s", e)
+            logger.error("Raw response: %s", response)
             raise
     
     def _validate_calculator_selection(self, selection_data: Dict[str, Any], context: ConversationContext) -> CalculatorSelection:
@@ -156,7 +205,7 @@ class SemanticCalculatorSelector:
         confidence = float(selection_data["confidence"])
         if confidence < 0.0 or confidence > 1.0:
             confidence = max(0.0, min(1.0, confidence))
-            logger.warning(f"Confidence score adjusted to valid range: {confidence}")
+            logger.warning("Confidence score adjusted to valid range: %s", confidence)
         
         # Get clarification questions
         clarification_questions = selection_data.get("clarification_questions", [])
@@ -260,19 +309,19 @@ class SemanticCalculatorSelector:
             return False
             
         except Exception as e:
-            logger.error(f"Error checking if calculator is needed: {e}")
+            logger.error("Error checking if calculator is needed: %s", e)
             return False
     
     def _get_fallback_calculator_selection(self, query: str, context: ConversationContext) -> CalculatorSelection:
         """Get fallback calculator selection when main selection fails"""
         
-        # Simple fallback logic based on keywords
-        query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["quick", "fast", "estimate", "basic", "simple"]):
+        # Simple fallback logic based on keywords - one pass over the query via the compiled union
+        scores = Counter(_FALLBACK_KEYWORDS[m] for m in _FALLBACK_PATTERN.findall(query.lower()))
+
+        if scores.get(CalculatorType.QUICK):
             calculator_type = CalculatorType.QUICK
             reasoning = "Fallback to quick calculator based on speed-related keywords"
-        elif any(word in query_lower for word in ["portfolio", "investment", "asset", "allocation"]):
+        elif scores.get(CalculatorType.PORTFOLIO):
             calculator_type = CalculatorType.PORTFOLIO
             reasoning = "Fallback to portfolio calculator based on investment-related keywords"
         else:
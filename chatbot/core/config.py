@@ -12,7 +12,10 @@ class ChatbotConfig(BaseSettings):
     # OpenAI Configuration
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     openai_model: str = "gpt-4o-mini"  # Use more cost-effective model
+    evaluator_model: str = "gpt-4o-mini"  # Small/cheap model for response grading
     openai_temperature: float = 0.1
+    llm_max_concurrency: int = 16  # Cap on simultaneous OpenAI calls to avoid 429s
+    llm_timeout_seconds: float = 20.0  # Per-call ceiling so a hung upstream can't stall a turn
     
     # Qdrant Configuration - Use in-memory by default
     qdrant_host: str = os.getenv("QDRANT_HOST", ":memory:")  # In-memory by default
@@ -37,7 +40,12 @@ class ChatbotConfig(BaseSettings):
     min_rag_confidence: float = 0.7  # Lower threshold for better coverage
     min_search_confidence: float = 0.55  # Lowered from 0.6 to allow more external search results
     min_overall_confidence: float = 0.5
+    speculative_search: bool = True  # Start external search concurrently with RAG instead of after it
     
+    # Session Management
+    max_sessions: int = 10000  # LRU cap on in-memory chat sessions
+    session_ttl_seconds: int = 3600  # Idle sessions older than this are evicted
+
     # File Upload Configuration
     max_file_size: int = 10 * 1024 * 1024  # 10MB
     supported_file_types: list = [".pdf", ".csv", ".xlsx", ".xls", ".docx", ".doc", ".txt"]
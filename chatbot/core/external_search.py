@@ -1,50 +1,78 @@
 import os
 import asyncio
+import hashlib
 import logging
+import re
 from typing import Dict, Any, List, Optional
+import orjson
 from openai import AsyncOpenAI
 from .schemas import SearchResult, ConversationContext
 from .config import config
+from .llm_cache import cached_chat_completion
+from .llm_client import get_shared_openai_client
 import time
 
 logger = logging.getLogger(__name__)
 
-class SearchQualityEvaluator:
-    """Evaluates quality of search results using semantic understanding"""
-    
-    def __init__(self):
-        self.llm = AsyncOpenAI(
-            api_key=config.openai_api_key
-        )
-        self.model = config.openai_model
-        self.temperature = config.openai_temperature
-    
-    async def evaluate_search_quality(self, results: List[Dict[str, Any]], query: str, context: ConversationContext) -> List[float]:
-        """Evaluate quality of search results using semantic understanding"""
-        
-        try:
-            quality_scores = []
-            
-            for result in results:
-                score = await self._evaluate_single_result(result, query, context)
-                quality_scores.append(score)
-            
-            return quality_scores
-            
-        except Exception as e:
-            logger.error(f"Error evaluating search quality: {e}")
-            # Return default scores
-            return [0.5] * len(results)
-    
-    async def _evaluate_single_result(self, result: Dict[str, Any], query: str, context: ConversationContext) -> float:
-        """Evaluate quality of a single search result"""
-        
-        try:
-            prompt = f"""
+# The single-result prompt asks for a bare 0.0-1.0 score; the pattern is only
+# ever fullmatched against the stripped output so a stray "0" or "1" inside
+# prose is never mistaken for the score
+_SCORE_PATTERN = re.compile(r"[01](?:\.\d+)?")
+
+# Quality judgment rarely needs more than the start of a result; truncating the
+# content bounds prefill tokens (and cost) regardless of source page length
+_QUALITY_CONTENT_MAX_CHARS = 2000
+
+def _truncate_content(content: str) -> str:
+    """Bound result content for quality-eval prompts, marking truncation"""
+
+    if len(content) > _QUALITY_CONTENT_MAX_CHARS:
+        return content[:_QUALITY_CONTENT_MAX_CHARS] + "..."
+    return content
+
+# Static prompt scaffolding hoisted to module scope - only the query/content holes vary per call
+_BATCH_QUALITY_PROMPT = """
+        Evaluate the quality and relevance of each of these search results:
+
+        **Query:** "{query}"
+
+        {numbered_results}
+
+        **Evaluation Criteria:**
+            1. **Relevance**: How well does the result answer the query?
+            2. **Accuracy**: Is the information factual and reliable?
+            3. **Completeness**: Does it provide sufficient detail?
+            4. **Currency**: Is the information current and up-to-date?
+            5. **Usefulness**: Would this help a financial advisor or client?
+
+            **Special Considerations for Financial Information:**
+            - Current rates, prices, and market conditions are HIGHLY valuable even if brief
+            - Company-specific information (like Progressive rates) is VALUABLE for comparison
+            - Recent changes and updates are CRITICAL for financial planning
+            - Don't penalize brief responses if they contain current, actionable information
+            - Real-time market data is often more valuable than comprehensive historical data
+
+            **Score each result from 0.0 to 1.0:**
+            - 0.0-0.3: Poor quality, not relevant
+            - 0.4-0.6: Moderate quality, somewhat relevant
+            - 0.7-0.8: Good quality, relevant
+            - 0.9-1.0: Excellent quality, highly relevant
+
+            **For current financial information (rates, prices, company info):**
+            - If it contains current rates/prices: minimum 0.7
+            - If it mentions specific companies: minimum 0.6
+            - If it's recent/current year: minimum 0.6
+            - If it's about current market conditions: minimum 0.7
+
+            **Return JSON with one entry per result:**
+            {{"scores": [{{"id": 0, "overall_score": 0.8}}, {{"id": 1, "overall_score": 0.5}}]}}
+        """
+
+_SINGLE_QUALITY_PROMPT = """
         Evaluate the quality and relevance of this search result:
         
         **Query:** "{query}"
-        **Search Result:** "{result.get('content', '')}"
+        **Search Result:** "{content}"
         
         **Evaluation Criteria:**
             1. **Relevance**: How well does this result answer the query?
@@ -79,19 +107,147 @@ class SearchQualityEvaluator:
             - General financial advice: 0.5-0.7
             
             Score: """
-            
-            response = await self.llm.chat.completions.create(
+
+
+class SearchQualityEvaluator:
+    """Evaluates quality of search results using semantic understanding"""
+    
+    def __init__(self):
+        self.llm = get_shared_openai_client()
+        self.model = config.openai_model
+        self.temperature = config.openai_temperature
+    
+    async def evaluate_search_quality(self, results: List[Dict[str, Any]], query: str, context: ConversationContext) -> List[float]:
+        """Evaluate quality of search results using semantic understanding"""
+
+        try:
+            if not results:
+                return []
+
+            # Empty/near-empty contents are guaranteed low quality - score 0.0 without an LLM call.
+            # Byte-identical contents are common in search output - score each distinct content once.
+            digests = []
+            unique_indices: Dict[bytes, int] = {}
+            unique_results = []
+            for result in results:
+                content = (result.get('content') or '').strip()
+                if len(content) < 32:
+                    digests.append(None)
+                    continue
+                digest = hashlib.blake2b(content.encode(), digest_size=16).digest()
+                digests.append(digest)
+                if digest not in unique_indices:
+                    unique_indices[digest] = len(unique_results)
+                    unique_results.append(result)
+
+            if not unique_results:
+                return [0.0] * len(results)
+
+            # Score all unique results in one LLM call - round-trips dominate the cost here
+            batch_scores = await self._evaluate_results_batch(unique_results, query)
+            if batch_scores is not None:
+                return [
+                    batch_scores[unique_indices[digest]] if digest is not None else 0.0
+                    for digest in digests
+                ]
+
+            # Fallback: score each unique result individually if the batch response couldn't be parsed.
+            # The calls are independent and network-bound, so fan them out concurrently.
+            tasks = [self._evaluate_single_result(result, query, context) for result in unique_results]
+            responses = await asyncio.gather(*tasks, return_exceptions=True)
+            unique_scores = [score if isinstance(score, float) else 0.5 for score in responses]
+
+            return [
+                unique_scores[unique_indices[digest]] if digest is not None else 0.0
+                for digest in digests
+            ]
+
+        except Exception as e:
+            logger.error(f"Error evaluating search quality: {e}")
+            # Return default scores
+            return [0.5] * len(results)
+
+    async def _evaluate_results_batch(self, results: List[Dict[str, Any]], query: str) -> Optional[List[float]]:
+        """Score all search results in a single LLM call; returns None if the response can't be parsed"""
+
+        try:
+            prompt = self._build_batch_quality_prompt(results, query)
+
+            response = await cached_chat_completion(
+                self.llm,
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert evaluator of financial information quality and relevance. Be GENEROUS to current/real-time information as it's highly valuable for financial planning."},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=self.temperature,
-                max_tokens=100
+                max_tokens=50 * len(results) + 50,
+                response_format={"type": "json_object"}
             )
-            
-            score_text = response.choices[0].message.content.strip()
-            
+
+            scores_data = orjson.loads(response.choices[0].message.content)
+            scores_by_id = {int(entry["id"]): float(entry["overall_score"]) for entry in scores_data["scores"]}
+
+            quality_scores = []
+            for i, result in enumerate(results):
+                score = scores_by_id.get(i, 0.5)
+                # Apply minimum thresholds for valuable current information
+                if self._contains_current_financial_info(result.get('content', ''), query):
+                    score = max(score, 0.65)
+                quality_scores.append(max(0.0, min(1.0, score)))
+
+            return quality_scores
+
+        except Exception as e:
+            logger.error(f"Batch quality evaluation failed, falling back to per-result scoring: {e}")
+            return None
+
+    def _build_batch_quality_prompt(self, results: List[Dict[str, Any]], query: str) -> str:
+        """Build a single prompt that scores every search result at once"""
+
+        numbered_results = "\n\n".join(
+            f"**Result {i}:** \"{_truncate_content(result.get('content', ''))}\""
+            for i, result in enumerate(results)
+        )
+
+        return _BATCH_QUALITY_PROMPT.format_map({"query": query, "numbered_results": numbered_results})
+
+    async def _evaluate_single_result(self, result: Dict[str, Any], query: str, context: ConversationContext) -> float:
+        """Evaluate quality of a single search result"""
+        
+        try:
+            prompt = _SINGLE_QUALITY_PROMPT.format_map({"query": query, "content": _truncate_content(result.get('content', ''))})
+
+            # Stream the response and stop reading as soon as the score is complete -
+            # anything the model says after the number is never used
+            stream = await self.llm.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are an expert evaluator of financial information quality and relevance. Be GENEROUS to current/real-time information as it's highly valuable for financial planning."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=self.temperature,
+                max_tokens=100,
+                stream=True
+            )
+
+            buffer = ""
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    buffer += chunk.choices[0].delta.content
+                # Close early only once the entire output so far is a score
+                # followed by whitespace - the whitespace proves the number is
+                # complete, and fullmatch means prose like "On a scale of 0 to
+                # 1..." never triggers the exit
+                stripped = buffer.strip()
+                if stripped and buffer[-1].isspace() and _SCORE_PATTERN.fullmatch(stripped):
+                    await stream.close()
+                    break
+
+            stripped = buffer.strip()
+            match = _SCORE_PATTERN.fullmatch(stripped)
+            score_text = match.group(0) if match else stripped
+
             # Extract numeric score
             try:
                 score = float(score_text)
@@ -362,27 +518,29 @@ class ExternalSearchSystem:
     def _enhance_search_query(self, query: str, context: ConversationContext) -> str:
         """Enhance search query with context information - ULTRA CONSERVATIVE approach to prevent duplication"""
         
-        # Start with the original query - minimal enhancement to prevent duplication
-        enhanced_query = query
-        
+        # Collect enhancement parts and join once - minimal enhancement to prevent duplication
+        parts = [query]
+        query_lower = query.lower()
+
         # ONLY add essential context if the query is very short (less than 50 characters)
         # This prevents over-enhancement that could create different queries
         if len(query) < 50:
             # Add minimal financial context only if not already present
-            if "life insurance" not in query.lower():
-                enhanced_query += " life insurance"
-        
+            if "life insurance" not in query_lower:
+                parts.append("life insurance")
+
         # NO additional enhancements - keep it minimal to prevent query variations
         # This ensures our deduplication logic works properly
-        
+
         # Special case: only add year if explicitly asking for current information
-        query_lower = query.lower()
         current_info_needed = any(term in query_lower for term in ["rate", "price", "current", "today", "latest", "recent"])
-        
+
         if current_info_needed and "2024" not in query_lower and "2025" not in query_lower:
             # Only add year if it's a very short query asking for current info
             if len(query) < 60:
-                enhanced_query += " 2025"
+                parts.append("2025")
+
+        enhanced_query = " ".join(parts)
         
         # CRITICAL: Limit total enhancement to prevent query variations
         # If enhancement would make query too different, revert to original
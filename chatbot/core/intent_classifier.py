@@ -1,57 +1,69 @@
+import asyncio
+import hashlib
 import json
 import logging
-from typing import List, Dict, Any
+import re
+from collections import OrderedDict
+from typing import ClassVar, List, Dict, Any, Optional, Tuple
+import numpy as np
+import orjson
 from openai import AsyncOpenAI
 from .schemas import IntentResult, IntentCategory, CalculatorType, ConversationContext, KnowledgeLevel
 from .config import config
+from .llm_cache import cached_chat_completion, cached_embedding
+from .llm_client import get_shared_openai_client
 
 logger = logging.getLogger(__name__)
 
-class ConversationContextAnalyzer:
-    """Analyzes conversation history to extract semantic context"""
-    
-    def __init__(self):
-        self.llm = AsyncOpenAI(api_key=config.openai_api_key)
-    
-    async def extract_semantic_context(self, chat_history: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Extract semantic meaning from conversation history using LLM"""
-        
-        if not chat_history:
-            return self._get_default_context()
-        
-        try:
-            # Analyze last 10 messages for context using LLM
-            recent_messages = chat_history[-10:]
-            
-            prompt = self._build_context_analysis_prompt(recent_messages)
-            
-            response = await self.llm.chat.completions.create(
-                model=config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1
-            )
-            
-            # Parse LLM response for semantic context
-            context_data = self._parse_context_response(response.choices[0].message.content)
-            return context_data
-            
-        except Exception as e:
-            logger.error(f"Error in semantic context analysis: {e}")
-            return self._get_default_context()
-    
-    def _build_context_analysis_prompt(self, messages: List[Dict[str, Any]]) -> str:
-        """Build prompt for LLM-based context analysis"""
-        
-        message_texts = []
-        for msg in messages:
-            if msg.get("type") == "user":
-                message_texts.append(f"User: {msg.get('content', '')}")
-            else:
-                message_texts.append(f"Assistant: {msg.get('content', '')}")
-        
-        conversation_text = "\n".join(message_texts)
-        
-        return f"""
+# Reused decoder for in-place JSON extraction from LLM responses
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _loads_llm_json(response: str) -> Optional[Dict[str, Any]]:
+    """Parse a JSON object out of an LLM response.
+
+    With JSON mode the response is normally pure JSON, so try orjson (several
+    times faster than stdlib) on the whole payload first; fall back to an
+    in-place raw_decode from the first brace for prose-wrapped output.
+    """
+
+    try:
+        return orjson.loads(response)
+    except orjson.JSONDecodeError:
+        pass
+
+    start_idx = response.find('{')
+    if start_idx != -1:
+        obj, _ = _JSON_DECODER.raw_decode(response, start_idx)
+        return obj
+    return None
+
+
+# Strong-signal patterns compiled once at import; queries matching these skip the LLM entirely.
+# Only unambiguous phrasings belong here - the ambiguous tail still goes through semantic analysis.
+_FAST_CALCULATION_PATTERN = re.compile(
+    r"^\s*calculate\b"
+    r"|\bhow much (?:life insurance|insurance|coverage)\b"
+    r"|\bcoverage amount\b"
+    r"|\bneeds assessment\b"
+    r"|\bquick quote\b"
+    r"|\binsurance calculator\b"
+)
+_FAST_EDUCATION_PATTERN = re.compile(
+    r"^\s*(?:what is|explain)\b.*\b(?:term life|whole life|universal life|iul|life insurance|cash value|death benefit)\b"
+)
+
+# Fallback keyword lists compiled into one alternation each - a single linear
+# scan per category instead of per-keyword substring loops
+_FALLBACK_CALC_PATTERN = re.compile(
+    r"calculate|how much|coverage|needs|amount|calculator|assessment|start"
+)
+_FALLBACK_EDU_PATTERN = re.compile(
+    r"explain|what is|difference|compare"
+)
+
+# Prompt scaffolding is static - hoist it to module scope so each call only fills the holes
+_CONTEXT_ANALYSIS_PROMPT = """
         Analyze this conversation to extract semantic context and user characteristics:
         
         **Conversation:**
@@ -65,125 +77,27 @@ class ConversationContextAnalyzer:
         5. **Client Context**: Are they asking for themselves or for client assessment?
         6. **Previous Calculations**: Any mentions of calculations or assessments?
         7. **Expressed Preferences**: Any specific preferences or requirements mentioned?
-        
-        **Return JSON format:**
-        {{
-            "user_goals": ["goal1", "goal2"],
-            "knowledge_level": "beginner|intermediate|expert",
-            "semantic_themes": ["theme1", "theme2"],
-            "current_topic": "main topic of interest",
-            "client_context": "personal|client_assessment|both",
-            "previous_calculations": ["calc1", "calc2"],
-            "expressed_preferences": ["pref1", "pref2"]
-        }}
-        
+
         **Analysis Guidelines:**
         - Focus on semantic meaning, not just keywords
         - Consider context and implied goals
         - Assess knowledge level from question complexity and terminology
         - Identify underlying financial planning needs
         """
-    
-    def _parse_context_response(self, response: str) -> Dict[str, Any]:
-        """Parse LLM response for context data"""
-        
-        try:
-            # Try to extract JSON from response
-            start_idx = response.find('{')
-            end_idx = response.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != 0:
-                json_str = response[start_idx:end_idx]
-                context_data = json.loads(json_str)
-                
-                # Validate and set defaults
-                return {
-                    "user_goals": context_data.get("user_goals", []),
-                    "knowledge_level": KnowledgeLevel(context_data.get("knowledge_level", "beginner")),
-                    "semantic_themes": context_data.get("semantic_themes", []),
-                    "current_topic": context_data.get("current_topic", "general"),
-                    "client_context": context_data.get("client_context", "personal"),
-                    "previous_calculations": context_data.get("previous_calculations", []),
-                    "expressed_preferences": context_data.get("expressed_preferences", [])
-                }
-            
-        except Exception as e:
-            logger.error(f"Error parsing context response: {e}")
-        
-        # Fallback to default context
-        return self._get_default_context()
-    
-    def _get_default_context(self) -> Dict[str, Any]:
-        """Get default context when analysis fails"""
-        
-        return {
-            "user_goals": [],
-            "knowledge_level": KnowledgeLevel.BEGINNER,
-            "client_context": "personal",
-            "previous_calculations": [],
-            "expressed_preferences": [],
-            "semantic_themes": [],
-            "current_topic": "general"
-        }
 
-class SemanticIntentClassifier:
-    """Uses pure LLM-based semantic understanding for intent classification"""
-    
-    def __init__(self):
-        self.llm = AsyncOpenAI(
-            api_key=config.openai_api_key
-        )
-        self.context_analyzer = ConversationContextAnalyzer()
-    
-    async def classify_intent_semantically(self, query: str, context: ConversationContext) -> IntentResult:
-        """Classify intent using pure semantic understanding"""
-        
-        try:
-            logger.info(f"🔍 INTENT CLASSIFIER: Starting semantic classification for query: '{query[:100]}...'")
-            
-            # Build comprehensive semantic analysis prompt
-            prompt = self._build_semantic_intent_prompt(query, context)
-            
-            # Get LLM response
-            response = await self.llm.chat.completions.create(
-                model=config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1
-            )
-            
-            logger.info(f"🔍 INTENT CLASSIFIER: Raw LLM response: '{response.choices[0].message.content[:200]}...'")
-            
-            # Parse semantic intent result
-            intent_result = self._parse_semantic_intent(response.choices[0].message.content, query, context)
-            
-            logger.info(f"🔍 INTENT CLASSIFIER: Final classification: {intent_result.intent.value} with confidence {intent_result.confidence}")
-            logger.info(f"🔍 INTENT CLASSIFIER: Reasoning: {intent_result.reasoning}")
-            logger.info(f"🔍 INTENT CLASSIFIER: Semantic goal: {intent_result.semantic_goal}")
-            
-            return intent_result
-            
-        except Exception as e:
-            logger.error(f"🔍 INTENT CLASSIFIER: Error in semantic intent classification: {e}")
-            import traceback
-            logger.error(f"🔍 INTENT CLASSIFIER: Full traceback: {traceback.format_exc()}")
-            return self._get_fallback_intent(query, context)
-    
-    def _build_semantic_intent_prompt(self, query: str, context: ConversationContext) -> str:
-        """Build comprehensive prompt for semantic intent analysis"""
-        
-        return f"""
+_SEMANTIC_INTENT_PROMPT = """
         You are an expert financial advisor assistant. Analyze this query to understand the user's semantic intent and underlying needs.
         
         **User Query:** "{query}"
         
         **Conversation Context:**
-        - Knowledge Level: {context.knowledge_level.value}
-        - Previous Themes: {', '.join(context.semantic_themes) if context.semantic_themes else 'None'}
-        - Current Focus: {context.current_topic or 'General'}
-        - Expressed Goals: {', '.join(context.user_goals) if context.user_goals else 'None'}
-        - Client Context: {context.client_context or 'Personal'}
-        - Calculator State: {context.calculator_state or 'None'}
-        - Calculator Type: {context.calculator_type or 'None'}
+        - Knowledge Level: {knowledge_level}
+        - Previous Themes: {themes}
+        - Current Focus: {topic}
+        - Expressed Goals: {goals}
+        - Client Context: {client_context}
+        - Calculator State: {calculator_state}
+        - Calculator Type: {calculator_type}
         
         **Semantic Analysis Required:**
         1. **What is the user REALLY asking for?** (not just surface-level words)
@@ -222,21 +136,6 @@ class SemanticIntentClassifier:
         - Requires followup to determine: quick, detailed, or portfolio calculator
         
         **IMPORTANT:** Only set calculator_type if the user is explicitly asking for a calculation or needs assessment. For general questions, education, or information requests, set calculator_type to "none".
-        
-        **Response Format (JSON):**
-        {{
-            "intent": "intent_category",
-            "semantic_goal": "what they really want in detail",
-            "calculator_type": "quick|detailed|portfolio|none",
-            "confidence": 0.95,
-            "reasoning": "detailed explanation of why this classification",
-            "follow_up_clarification": "questions to confirm understanding if needed",
-            "user_knowledge_assessment": "beginner|intermediate|expert",
-            "priority_level": "high|medium|low",
-            "needs_external_search": true|false,
-            "needs_calculator_selection": true|false,
-            "suggested_calculator": "quick|detailed|portfolio|none"
-        }}
 
         **CRITICAL RULES:**
         - For education queries (life_insurance_education, product_comparison), set calculator_type to "none"
@@ -325,18 +224,361 @@ class SemanticIntentClassifier:
         - **CRITICAL: External search should be rare and only for truly current/real-time needs**
         - **NEW: Consider calculator state when determining intent**
         """
+
+# Strict response schemas enforced server-side via structured outputs. The model
+# cannot return prose-wrapped or malformed JSON, so the "Return JSON format"
+# scaffolding is gone from the prompts (fewer prefill tokens) and the parsers'
+# salvage fallbacks should never fire.
+_CONTEXT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "conversation_context",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "user_goals": {"type": "array", "items": {"type": "string"}},
+                "knowledge_level": {"type": "string", "enum": ["beginner", "intermediate", "expert"]},
+                "semantic_themes": {"type": "array", "items": {"type": "string"}},
+                "current_topic": {"type": "string"},
+                "client_context": {"type": "string", "enum": ["personal", "client_assessment", "both"]},
+                "previous_calculations": {"type": "array", "items": {"type": "string"}},
+                "expressed_preferences": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": [
+                "user_goals", "knowledge_level", "semantic_themes", "current_topic",
+                "client_context", "previous_calculations", "expressed_preferences"
+            ],
+            "additionalProperties": False
+        }
+    }
+}
+
+_INTENT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "semantic_intent",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "intent": {
+                    "type": "string",
+                    "enum": [
+                        "life_insurance_education", "insurance_needs_calculation",
+                        "portfolio_integration_analysis", "client_assessment_support",
+                        "product_comparison", "scenario_analysis", "general_financial_advice",
+                        "calculator_selection_choice", "calculator_choice_selected",
+                        "conversation_management"
+                    ]
+                },
+                "semantic_goal": {"type": "string"},
+                "calculator_type": {"type": "string", "enum": ["quick", "detailed", "portfolio", "none"]},
+                "confidence": {"type": "number"},
+                "reasoning": {"type": "string"},
+                "follow_up_clarification": {"type": "array", "items": {"type": "string"}},
+                "user_knowledge_assessment": {"type": "string", "enum": ["beginner", "intermediate", "expert"]},
+                "priority_level": {"type": "string", "enum": ["high", "medium", "low"]},
+                "needs_external_search": {"type": "boolean"},
+                "needs_calculator_selection": {"type": "boolean"},
+                "suggested_calculator": {"type": "string", "enum": ["quick", "detailed", "portfolio", "none"]}
+            },
+            "required": [
+                "intent", "semantic_goal", "calculator_type", "confidence", "reasoning",
+                "follow_up_clarification", "user_knowledge_assessment", "priority_level",
+                "needs_external_search", "needs_calculator_selection", "suggested_calculator"
+            ],
+            "additionalProperties": False
+        }
+    }
+}
+
+
+class SemanticIntentCache:
+    """Embedding-based cache that reuses intent results for semantically equivalent queries"""
+
+    def __init__(self, similarity_threshold: float = 0.92, max_entries_per_key: int = 128):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_key = max_entries_per_key
+        # Bucketed by (knowledge_level, current_topic) so context-sensitive intents don't collide
+        self._entries: Dict[Tuple[str, str], List[Tuple[np.ndarray, IntentResult]]] = {}
+
+    def lookup(self, key: Tuple[str, str], embedding: np.ndarray) -> Optional[IntentResult]:
+        """Return the cached intent for the most similar query if it clears the threshold"""
+
+        bucket = self._entries.get(key)
+        if not bucket:
+            return None
+
+        # Embeddings are stored normalized, so cosine similarity is a dot product
+        similarities = np.stack([entry[0] for entry in bucket]) @ embedding
+        best_idx = int(np.argmax(similarities))
+
+        if similarities[best_idx] >= self.similarity_threshold:
+            return bucket[best_idx][1]
+        return None
+
+    def store(self, key: Tuple[str, str], embedding: np.ndarray, result: IntentResult) -> None:
+        """Cache an intent result under its query embedding"""
+
+        bucket = self._entries.setdefault(key, [])
+        bucket.append((embedding, result))
+        if len(bucket) > self.max_entries_per_key:
+            bucket.pop(0)
+
+class ConversationContextAnalyzer:
+    """Analyzes conversation history to extract semantic context"""
+
+    _CTX_CACHE_MAX_ENTRIES = 256
+
+    def __init__(self):
+        self.llm = get_shared_openai_client()
+        # Keyed on a hash of the recent-message window; consecutive turns overlap heavily
+        self._ctx_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def extract_semantic_context(self, chat_history: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract semantic meaning from conversation history using LLM"""
+
+        if not chat_history:
+            return self._get_default_context()
+
+        try:
+            # Analyze last 10 messages for context using LLM
+            recent_messages = chat_history[-10:]
+
+            # Unchanged message windows (e.g. re-analysis within a turn) skip the LLM call
+            cache_key = hashlib.blake2b(
+                orjson.dumps([m.get('content') for m in recent_messages])
+            ).hexdigest()
+            cached_context = self._ctx_cache.get(cache_key)
+            if cached_context is not None:
+                self._ctx_cache.move_to_end(cache_key)
+                return cached_context
+
+            prompt = self._build_context_analysis_prompt(recent_messages)
+
+            response = await cached_chat_completion(
+                self.llm,
+                model=config.openai_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+                response_format=_CONTEXT_RESPONSE_FORMAT
+            )
+
+            # Parse LLM response for semantic context
+            context_data = self._parse_context_response(response.choices[0].message.content)
+
+            self._ctx_cache[cache_key] = context_data
+            while len(self._ctx_cache) > self._CTX_CACHE_MAX_ENTRIES:
+                self._ctx_cache.popitem(last=False)
+
+            return context_data
+
+        except Exception as e:
+            logger.error(f"Error in semantic context analysis: {e}")
+            return self._get_default_context()
+    
+    def _build_context_analysis_prompt(self, messages: List[Dict[str, Any]]) -> str:
+        """Build prompt for LLM-based context analysis"""
+        
+        message_texts = []
+        for msg in messages:
+            if msg.get("type") == "user":
+                message_texts.append(f"User: {msg.get('content', '')}")
+            else:
+                message_texts.append(f"Assistant: {msg.get('content', '')}")
+        
+        conversation_text = "\n".join(message_texts)
+        
+        return _CONTEXT_ANALYSIS_PROMPT.format_map({"conversation_text": conversation_text})
+    
+    def _parse_context_response(self, response: str) -> Dict[str, Any]:
+        """Parse LLM response for context data"""
+        
+        try:
+            context_data = _loads_llm_json(response)
+
+            if context_data is not None:
+                # Validate and set defaults
+                return {
+                    "user_goals": context_data.get("user_goals", []),
+                    "knowledge_level": KnowledgeLevel(context_data.get("knowledge_level", "beginner")),
+                    "semantic_themes": context_data.get("semantic_themes", []),
+                    "current_topic": context_data.get("current_topic", "general"),
+                    "client_context": context_data.get("client_context", "personal"),
+                    "previous_calculations": context_data.get("previous_calculations", []),
+                    "expressed_preferences": context_data.get("expressed_preferences", [])
+                }
+            
+        except Exception as e:
+            logger.error(f"Error parsing context response: {e}")
+        
+        # Fallback to default context
+        return self._get_default_context()
+    
+    def _get_default_context(self) -> Dict[str, Any]:
+        """Get default context when analysis fails"""
+        
+        return {
+            "user_goals": [],
+            "knowledge_level": KnowledgeLevel.BEGINNER,
+            "client_context": "personal",
+            "previous_calculations": [],
+            "expressed_preferences": [],
+            "semantic_themes": [],
+            "current_topic": "general"
+        }
+
+class SemanticIntentClassifier:
+    """Uses pure LLM-based semantic understanding for intent classification"""
+    
+    # Mapping tables built once at class creation instead of per classification
+    _INTENT_MAPPING: ClassVar[Dict[str, IntentCategory]] = {
+        "life_insurance_education": IntentCategory.LIFE_INSURANCE_EDUCATION,
+        "insurance_needs_calculation": IntentCategory.INSURANCE_NEEDS_CALCULATION,
+        "portfolio_integration_analysis": IntentCategory.PORTFOLIO_INTEGRATION_ANALYSIS,
+        "client_assessment_support": IntentCategory.CLIENT_ASSESSMENT_SUPPORT,
+        "product_comparison": IntentCategory.PRODUCT_COMPARISON,
+        "scenario_analysis": IntentCategory.SCENARIO_ANALYSIS,
+        "general_financial_advice": IntentCategory.GENERAL_FINANCIAL_ADVICE,
+        "calculator_selection_choice": IntentCategory.CALCULATOR_SELECTION_CHOICE,
+        "calculator_choice_selected": IntentCategory.CALCULATOR_CHOICE_SELECTED,
+        "conversation_management": IntentCategory.CONVERSATION_MANAGEMENT
+    }
+    _CALC_MAPPING: ClassVar[Dict[str, CalculatorType]] = {
+        "quick": CalculatorType.QUICK,
+        "detailed": CalculatorType.DETAILED,
+        "portfolio": CalculatorType.PORTFOLIO,
+        "none": CalculatorType.NONE
+    }
+
+    def __init__(self):
+        self.llm = get_shared_openai_client()
+        self.context_analyzer = ConversationContextAnalyzer()
+        self._semantic_cache = SemanticIntentCache()
+
+    async def classify_intent_semantically(self, query: str, context: ConversationContext) -> IntentResult:
+        """Classify intent using pure semantic understanding"""
+
+        try:
+            logger.info(f"🔍 INTENT CLASSIFIER: Starting semantic classification for query: '{query[:100]}...'")
+
+            # Unambiguous queries can be routed locally without any LLM or embedding call
+            fast_intent = self._try_fast_intent(query)
+            if fast_intent is not None:
+                logger.info(f"🔍 INTENT CLASSIFIER: Fast-path keyword match: {fast_intent.intent.value}")
+                return fast_intent
+
+            # Start the LLM classification and the cache-lookup embedding together.
+            # Routing downstream is deterministic, so the classification response is
+            # the only LLM round-trip on this path; overlapping it with the embedding
+            # means a cache miss pays one RTT instead of two back to back.
+            prompt = self._build_semantic_intent_prompt(query, context)
+            classification_task = asyncio.ensure_future(cached_chat_completion(
+                self.llm,
+                model=config.openai_model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+                response_format=_INTENT_RESPONSE_FORMAT
+            ))
+
+            # Check the semantic cache - a paraphrased repeat is a vector lookup, not an LLM call
+            cache_key = (context.knowledge_level.value, context.current_topic or "general")
+            query_embedding = await self._embed_query(query)
+
+            if query_embedding is not None:
+                cached_result = self._semantic_cache.lookup(cache_key, query_embedding)
+                if cached_result is not None:
+                    logger.info(f"🔍 INTENT CLASSIFIER: Semantic cache hit for query: '{query[:50]}...'")
+                    classification_task.cancel()
+                    return cached_result
+
+            response = await classification_task
+
+            logger.info(f"🔍 INTENT CLASSIFIER: Raw LLM response: '{response.choices[0].message.content[:200]}...'")
+            
+            # Parse semantic intent result
+            intent_result = self._parse_semantic_intent(response.choices[0].message.content, query, context)
+            
+            logger.info(f"🔍 INTENT CLASSIFIER: Final classification: {intent_result.intent.value} with confidence {intent_result.confidence}")
+            logger.info(f"🔍 INTENT CLASSIFIER: Reasoning: {intent_result.reasoning}")
+            logger.info(f"🔍 INTENT CLASSIFIER: Semantic goal: {intent_result.semantic_goal}")
+
+            if query_embedding is not None:
+                self._semantic_cache.store(cache_key, query_embedding, intent_result)
+
+            return intent_result
+            
+        except Exception as e:
+            logger.error(f"🔍 INTENT CLASSIFIER: Error in semantic intent classification: {e}")
+            import traceback
+            logger.error(f"🔍 INTENT CLASSIFIER: Full traceback: {traceback.format_exc()}")
+            return self._get_fallback_intent(query, context)
+
+    def _try_fast_intent(self, query: str) -> Optional[IntentResult]:
+        """Classify unambiguous queries with precompiled patterns, skipping the LLM"""
+
+        query_lower = query.lower()
+
+        if _FAST_CALCULATION_PATTERN.search(query_lower):
+            return IntentResult(
+                intent=IntentCategory.INSURANCE_NEEDS_CALCULATION,
+                semantic_goal="Calculate insurance coverage needs",
+                calculator_type=CalculatorType.QUICK,
+                confidence=0.9,
+                reasoning="Fast-path match on explicit calculation phrasing",
+                follow_up_clarification=[],
+                user_knowledge_assessment="beginner",
+                priority_level="medium"
+            )
+
+        if _FAST_EDUCATION_PATTERN.search(query_lower):
+            return IntentResult(
+                intent=IntentCategory.LIFE_INSURANCE_EDUCATION,
+                semantic_goal="Learn about life insurance concepts",
+                calculator_type=CalculatorType.NONE,
+                confidence=0.9,
+                reasoning="Fast-path match on explicit education phrasing",
+                follow_up_clarification=[],
+                user_knowledge_assessment="beginner",
+                priority_level="medium"
+            )
+
+        return None
+
+    async def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query for semantic cache lookups; returns None if embedding fails"""
+
+        try:
+            values = await cached_embedding(self.llm, query)
+            embedding = np.array(values, dtype=np.float32)
+            return embedding / np.linalg.norm(embedding)
+
+        except Exception as e:
+            logger.warning(f"🔍 INTENT CLASSIFIER: Query embedding failed, skipping semantic cache: {e}")
+            return None
+
+    def _build_semantic_intent_prompt(self, query: str, context: ConversationContext) -> str:
+        """Build comprehensive prompt for semantic intent analysis"""
+        
+        return _SEMANTIC_INTENT_PROMPT.format_map({
+            "query": query,
+            "knowledge_level": context.knowledge_level.value,
+            "themes": ', '.join(context.semantic_themes) if context.semantic_themes else 'None',
+            "topic": context.current_topic or 'General',
+            "goals": ', '.join(context.user_goals) if context.user_goals else 'None',
+            "client_context": context.client_context or 'Personal',
+            "calculator_state": context.calculator_state or 'None',
+            "calculator_type": context.calculator_type or 'None'
+        })
     
     def _parse_semantic_intent(self, response: str, original_query: str, context: ConversationContext) -> IntentResult:
         """Parse LLM response for semantic intent"""
         
         try:
-            # Extract JSON from response
-            start_idx = response.find('{')
-            end_idx = response.rfind('}') + 1
+            intent_data = _loads_llm_json(response)
             
-            if start_idx != -1 and end_idx != 0:
-                json_str = response[start_idx:end_idx]
-                intent_data = json.loads(json_str)
+            if intent_data is not None:
                 
                 # Map intent category
                 intent_category = self._map_intent_category(intent_data.get("intent", ""))
@@ -386,41 +628,21 @@ class SemanticIntentClassifier:
     
     def _map_intent_category(self, intent_str: str) -> IntentCategory:
         """Map string intent to IntentCategory enum"""
-        
-        intent_mapping = {
-            "life_insurance_education": IntentCategory.LIFE_INSURANCE_EDUCATION,
-            "insurance_needs_calculation": IntentCategory.INSURANCE_NEEDS_CALCULATION,
-            "portfolio_integration_analysis": IntentCategory.PORTFOLIO_INTEGRATION_ANALYSIS,
-            "client_assessment_support": IntentCategory.CLIENT_ASSESSMENT_SUPPORT,
-            "product_comparison": IntentCategory.PRODUCT_COMPARISON,
-            "scenario_analysis": IntentCategory.SCENARIO_ANALYSIS,
-            "general_financial_advice": IntentCategory.GENERAL_FINANCIAL_ADVICE,
-            "calculator_selection_choice": IntentCategory.CALCULATOR_SELECTION_CHOICE,
-            "calculator_choice_selected": IntentCategory.CALCULATOR_CHOICE_SELECTED,
-            "conversation_management": IntentCategory.CONVERSATION_MANAGEMENT
-        }
-        
-        return intent_mapping.get(intent_str, IntentCategory.GENERAL_FINANCIAL_ADVICE)
-    
+
+        return self._INTENT_MAPPING.get(intent_str, IntentCategory.GENERAL_FINANCIAL_ADVICE)
+
     def _map_calculator_type(self, calc_str: str) -> CalculatorType:
         """Map string calculator type to CalculatorType enum"""
-        
-        calc_mapping = {
-            "quick": CalculatorType.QUICK,
-            "detailed": CalculatorType.DETAILED,
-            "portfolio": CalculatorType.PORTFOLIO,
-            "none": CalculatorType.NONE
-        }
-        
-        return calc_mapping.get(calc_str, CalculatorType.NONE)
+
+        return self._CALC_MAPPING.get(calc_str, CalculatorType.NONE)
     
     def _get_fallback_intent(self, query: str, context: ConversationContext) -> IntentResult:
         """Get fallback intent when semantic analysis fails"""
         
         # Basic fallback logic
         query_lower = query.lower()
-        
-        if any(word in query_lower for word in ["calculate", "how much", "coverage", "needs", "amount", "calculator", "assessment", "start"]):
+
+        if _FALLBACK_CALC_PATTERN.search(query_lower):
             return IntentResult(
                 intent=IntentCategory.INSURANCE_NEEDS_CALCULATION,
                 semantic_goal="Calculate insurance coverage needs",
@@ -432,7 +654,7 @@ class SemanticIntentClassifier:
                 priority_level="medium"
             )
         
-        elif any(word in query_lower for word in ["explain", "what is", "difference", "compare"]):
+        elif _FALLBACK_EDU_PATTERN.search(query_lower):
             return IntentResult(
                 intent=IntentCategory.LIFE_INSURANCE_EDUCATION,
                 semantic_goal="Learn about life insurance concepts",
@@ -0,0 +1,103 @@
+"""
+Exact-match LLM response cache.
+
+The chatbot's classification/evaluation calls run at temperature 0.1 and are
+near-deterministic, so identical (model, messages, temperature) requests can
+safely reuse a previous response instead of paying another LLM round-trip.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Shared bound on in-flight OpenAI calls; unbounded gather fan-out trips rate
+# limits and causes retry storms that amplify both cost and tail latency
+_LLM_SEMAPHORE = asyncio.Semaphore(config.llm_max_concurrency)
+
+# Single-process LRU with TTL; sized for a busy session without unbounded growth
+_CACHE_MAX_ENTRIES = 1024
+_CACHE_TTL_SECONDS = 600
+
+_cache: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+def _cache_key(kwargs: dict) -> str:
+    """Build a deterministic key over the request parameters that affect the response"""
+
+    key_material = {
+        "model": kwargs.get("model"),
+        "messages": kwargs.get("messages"),
+        "temperature": kwargs.get("temperature"),
+        "max_tokens": kwargs.get("max_tokens"),
+        "response_format": kwargs.get("response_format")
+    }
+    return hashlib.sha256(json.dumps(key_material, sort_keys=True).encode()).hexdigest()
+
+async def cached_chat_completion(client, **kwargs):
+    """Call chat.completions.create with exact-match caching on the full request"""
+
+    key = _cache_key(kwargs)
+    now = time.time()
+
+    cached = _cache.get(key)
+    if cached is not None:
+        timestamp, response = cached
+        if now - timestamp < _CACHE_TTL_SECONDS:
+            _cache.move_to_end(key)
+            logger.debug("LLM cache hit for model %s", kwargs.get("model"))
+            return response
+        del _cache[key]
+
+    async with _LLM_SEMAPHORE:
+        response = await client.chat.completions.create(**kwargs)
+
+    _cache[key] = (now, response)
+    while len(_cache) > _CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+    return response
+
+# The same user message is embedded at several pipeline stages per turn
+# (intent cache, response cache, retrieval); identical text always embeds to
+# the same vector, so those stages share one cached result
+_EMBEDDING_CACHE_MAX_ENTRIES = 2048
+
+_embedding_cache: "OrderedDict[tuple[str, str], tuple[float, list]]" = OrderedDict()
+
+async def cached_embedding(client, text: str, model: str = config.embedding_model) -> list:
+    """Fetch an embedding with exact-match caching on (model, text)"""
+
+    key = (model, text)
+    now = time.time()
+
+    cached = _embedding_cache.get(key)
+    if cached is not None:
+        timestamp, embedding = cached
+        if now - timestamp < _CACHE_TTL_SECONDS:
+            _embedding_cache.move_to_end(key)
+            logger.debug("Embedding cache hit for model %s", model)
+            return embedding
+        del _embedding_cache[key]
+
+    async with _LLM_SEMAPHORE:
+        response = await client.embeddings.create(model=model, input=text)
+    embedding = response.data[0].embedding
+
+    _embedding_cache[key] = (now, embedding)
+    while len(_embedding_cache) > _EMBEDDING_CACHE_MAX_ENTRIES:
+        _embedding_cache.popitem(last=False)
+
+    return embedding
+
+def clear_cache() -> None:
+    """Drop all cached responses (used by tests)"""
+
+    _cache.clear()
+    _embedding_cache.clear()
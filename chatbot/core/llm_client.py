@@ -0,0 +1,35 @@
+"""
+Shared OpenAI client for the chatbot.
+
+Each class constructing its own AsyncOpenAI() gets its own TCP/TLS pool,
+which defeats keep-alive reuse across the pipeline. All LLM call sites
+should use get_shared_openai_client() instead.
+"""
+
+import httpx
+from openai import AsyncOpenAI
+
+from .config import config
+
+_shared_client: AsyncOpenAI = None
+
+def get_shared_openai_client() -> AsyncOpenAI:
+    """Return the process-wide AsyncOpenAI client, creating it on first use"""
+
+    global _shared_client
+
+    if _shared_client is None:
+        # Pool sized for the whole pipeline (generation, quality, compliance and
+        # the classifiers all run through this client, often concurrently); the
+        # short connect timeout fails fast on network trouble instead of eating
+        # into the overall request budget, and the SDK retries transient errors
+        _shared_client = AsyncOpenAI(
+            api_key=config.openai_api_key,
+            max_retries=2,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
+        )
+
+    return _shared_client
@@ -6,24 +6,283 @@ Handles in-chat calculations with user interaction.
 import asyncio
 import logging
 import json
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, TypedDict
+from datetime import datetime, timedelta
 import re
-from openai import AsyncOpenAI
 from .schemas import ConversationContext, KnowledgeLevel, CalculatorType
 from .config import config
 from .backend_integration import LifeInsuranceCalculator, BackendAPIIntegrator
+from .llm_client import get_shared_openai_client
 
 logger = logging.getLogger(__name__)
 
+# One C-level pass to strip currency formatting instead of chained .replace()
+_CURRENCY_STRIP = str.maketrans("", "", "$, ")
+
+# Answer-parsing patterns compiled once at import - these run on every turn
+_NUMBER_RE = re.compile(r"\d+")
+_DIGIT_RE = re.compile(r"\d")
+_CURRENCY_RE = re.compile(r"\$?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)")
+_CURRENCY_FLEX_RE = re.compile(r"\$?([\d,]+(?:\.\d+)?)")
+_NUMBER_PATTERNS = [
+    re.compile(r"\b(\d+)\s*(?:years? old?|y\.?o\.?|age)?\b", re.IGNORECASE),  # age patterns
+    re.compile(r"\b(\d+)\s*(?:children?|kids?|dependents?)\b", re.IGNORECASE),  # dependent patterns
+    re.compile(r"\b(\d+)\b")  # general number
+]
+_CURRENCY_PATTERNS = [
+    re.compile(r"\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)"),
+    re.compile(r"(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*dollars?", re.IGNORECASE),
+    re.compile(r"(\d+)\s*k\b", re.IGNORECASE),  # 50k = $50,000
+    re.compile(r"(\d+)\s*m\b", re.IGNORECASE)   # 1m = $1,000,000
+]
+
+# Static instruction text lives in system messages so OpenAI's automatic prompt
+# caching gets a stable prefix across sessions; only the small per-session
+# block travels in the user message (same layout as the orchestrator agents).
+_WELCOME_SYSTEM_PROMPT = """You generate the opening message for a life insurance needs calculation in a chat conversation.
+
+**Requirements:**
+- Keep it short and friendly (1-2 sentences max)
+- Make it feel like talking to a real financial advisor
+- Don't be overly formal or technical
+- Encourage them to start
+
+**Examples:**
+- Beginner: "Great! Let's figure out how much life insurance you need. I'll ask you a few simple questions."
+- Intermediate: "Perfect! I'll help you calculate your life insurance needs. This will only take a few minutes."
+- Expert: "Excellent! Let's calculate your life insurance needs. I'll need some basic information from you."
+"""
+
+_CONTEXTUAL_Q_SYSTEM_PROMPT = """You rephrase questions for a life insurance needs assessment in a chat conversation.
+
+**Requirements:**
+- Keep the question clear and friendly
+- Adapt to the user's knowledge level
+- Make it conversational and engaging
+- Include context from previous questions if relevant
+
+**Examples:**
+- Beginner: "To help us understand your life insurance needs better, what is your age?"
+- Intermediate: "For accurate coverage calculation, please tell me your current age."
+- Expert: "What is your age for the life insurance needs assessment?"
+
+Respond with only the rephrased question.
+"""
+
+_CALC_RESPONSE_SYSTEM_PROMPT = """You explain life insurance calculation results in a chat conversation.
+
+Generate a comprehensive response that explains the results clearly, covering the
+recommended coverage, the coverage breakdown, the premium and savings estimates,
+and the product recommendation.
+
+**Next Steps to include:**
+1. Review your coverage needs
+2. Compare with existing coverage
+3. Consider different product types
+4. Consult with a licensed insurance professional
+
+Please format this as a friendly, conversational response that explains the results clearly and provides actionable next steps.
+"""
+
+# Dynamic user blocks as module-level templates - the literal segments are
+# built once at import instead of re-assembled per call
+_WELCOME_USER_TEMPLATE = """**User Context:** {knowledge_level} level, current focus: {current_topic}
+
+**Generate a friendly welcome message:**
+"""
+
+_CONTEXTUAL_Q_USER_TEMPLATE = """**Base Question:** {question}
+**Question Type:** {question_type}
+**User Context:** {knowledge_level} level, current focus: {current_topic}
+
+**Generate a friendly, contextual version of the question:**
+"""
+
+_CALC_RESPONSE_USER_TEMPLATE = """**Calculation Results:**
+- Recommended Coverage: ${coverage:,}
+- Current Coverage: ${current_coverage:,}
+- Coverage Gap: ${coverage_gap:,}
+- Product: {product}
+- Duration: {duration_display}
+- Rationale: {rationale}
+
+**Coverage Breakdown:**
+- Living Expenses: ${living_expenses:,}
+- Debts: ${debts:,}
+- Education: ${education:,}
+- Funeral: ${funeral:,}
+- Legacy: ${legacy:,}
+- Other: ${other:,}
+
+**Monthly Premium Estimate:**
+- Estimated Monthly Premium: ${monthly_premium:,} (if $0, this indicates a calculation estimate)
+- Recommended Monthly Savings: ${monthly_savings:,}
+- Maximum Monthly Contribution: ${max_monthly:,}
+- Savings Level: {percentage:.0f}% of maximum
+
+**Key Factors:**
+- Calculation Method: {calculation_method}
+- Product Recommendation: {product}
+- Coverage Duration: {duration_display}"""
+
+# Fallback content rendered when LLM generation fails - the welcome is fully
+# static, the calculation fallback only needs the computed numbers filled in
+_DEFAULT_WELCOME = "Great! Let's calculate your life insurance needs. I'll ask you a few questions to get started."
+
+_DEFAULT_CALC_TEMPLATE = """🎉 **Your Life Insurance Needs Calculation is Complete!**
+
+**📊 SUMMARY CARDS:**
+• **Recommended Coverage:** ${coverage:,}
+• **Current Coverage:** ${current_coverage:,}
+• **Coverage Gap:** ${coverage_gap:,}
+• **Duration:** {duration_display}
+
+**🏆 PRODUCT RECOMMENDATION:**
+**{product}**
+
+{product_explanation}
+
+**Why this product?** {rationale}
+
+**📋 COVERAGE BREAKDOWN:**
+• Living Expenses: ${living_expenses:,}
+• Debts: ${debts:,}
+• Education: ${education:,}
+• Funeral: ${funeral:,}
+• Legacy: ${legacy:,}
+• Other: ${other:,}
+
+**💰 MONTHLY PREMIUM DETAILS:**
+• **Estimated Monthly Premium:** ${monthly_premium:,} (if $0, this indicates a calculation estimate)
+• **Recommended Monthly Savings:** ${monthly_savings:,}
+• **Maximum Monthly Contribution:** ${max_monthly:,}
+
+**💡 WHAT THIS MEANS:**
+The MEC (Modified Endowment Contract) limit is the maximum monthly contribution that keeps your policy from becoming a modified endowment contract, which has different tax implications.
+
+**📈 SAVINGS LEVEL INDICATOR:**
+{savings_color} **{savings_level}** ({percentage:.0f}% of maximum)
+
+**🎯 PROJECTION ASSUMPTIONS:**
+Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60% in subsequent years. Actual results may vary and are not guaranteed.
+
+**🚀 NEXT STEPS:**
+1. **Review the breakdown** - Does this coverage amount feel right for your situation?
+2. **Ask questions** - I can explain any part of the calculation in more detail
+3. **Explore options** - We can discuss different policy types and features
+4. **Get professional advice** - Consider consulting with a licensed insurance professional
+
+**💬 AVAILABLE ACTIONS:**
+• **Ask Robo-Advisor** - Get more detailed explanations
+• **Start Application** - Begin the application process
+• **Start Over** - Recalculate with different inputs
+
+**What would you like me to explain about this coverage amount or the different components?**"""
+
+# Hand-written knowledge-level variants for the standard questions. With three
+# discrete levels and a fixed question list there are only a handful of
+# possible rephrasings, so the common cases are served straight from this
+# table with no LLM round-trip. INTERMEDIATE reads fine as the base question
+# text, so only the BEGINNER and EXPERT registers get explicit entries;
+# anything not in the table falls through to the cached LLM path.
+_CONTEXTUAL_QUESTIONS = {
+    ("age", "beginner"): "To get started, could you tell me how old you are?",
+    ("age", "expert"): "What is your current age?",
+    ("marital_status", "beginner"): "Are you single, married, divorced, or widowed?",
+    ("marital_status", "expert"): "What is your marital status?",
+    ("dependents", "beginner"): "How many people count on your income — like children or parents you support?",
+    ("dependents", "expert"): "How many dependents do you have?",
+    ("monthly_income", "beginner"): "About how much do you earn each month before taxes? (e.g., $5,000)",
+    ("monthly_income", "expert"): "What is your gross monthly income? (e.g., $5,000)",
+    ("mortgage_balance", "beginner"): "Roughly how much do you owe in total — mortgage, loans, credit cards? (e.g., $300,000)",
+    ("mortgage_balance", "expert"): "What is your total outstanding debt? (e.g., $300,000)",
+    ("total_assets", "beginner"): "About how much do you have in savings and investments altogether? (e.g., $150,000)",
+    ("total_assets", "expert"): "What are your total assets? (e.g., $150,000)",
+    ("provide_education", "beginner"): "Would you like your coverage to help pay for your children's education? (yes/no)",
+    ("provide_education", "expert"): "Should the calculation fund dependents' education? (yes/no)",
+    ("individual_life", "beginner"): "Do you already have a life insurance policy of your own? If so, how much coverage? (e.g., $100,000, or 0 if none)",
+    ("individual_life", "expert"): "Current individual life coverage in force? (e.g., $100,000 or 0 if none)",
+    ("group_life", "beginner"): "Do you have life insurance through work? If so, how much? (e.g., $50,000, or 0 if none)",
+    ("group_life", "expert"): "Current group life coverage in force? (e.g., $50,000 or 0 if none)",
+    ("cash_value_importance", "beginner"): "Some policies can build up savings over time — is that something you'd want? (yes/no/unsure)",
+    ("cash_value_importance", "expert"): "Is cash value accumulation a priority? (yes/no/unsure)",
+    ("permanent_coverage", "beginner"): "Would you like coverage that lasts your whole life, not just a set number of years? (yes/no/unsure)",
+    ("permanent_coverage", "expert"): "Do you require permanent coverage? (yes/no/unsure)",
+    ("income_replacement_years", "beginner"): "If something happened to you, how many years of your income should your family be able to replace? (5-20 years, 10 is typical)",
+    ("income_replacement_years", "expert"): "Desired income replacement period? (5-20 years, default 10)",
+}
+
+# Static per-level welcomes used when there is no conversation topic to
+# personalize around - matches the examples in the system prompt above
+_WELCOME_MESSAGES = {
+    "beginner": "Great! Let's figure out how much life insurance you need. I'll ask you a few simple questions.",
+    "intermediate": "Perfect! I'll help you calculate your life insurance needs. This will only take a few minutes.",
+    "expert": "Excellent! Let's calculate your life insurance needs. I'll need some basic information from you.",
+}
+
+_SEMANTIC_PARSE_TEMPLATE = """Parse this user answer for a calculator question:
+
+Question: {question}
+Question Type: {question_type}
+Question ID: {question_id}
+User Answer: {answer}
+
+Extract the relevant value based on the question type and format it appropriately.
+Return only the parsed value, nothing else.
+"""
+
+_CONTEXTUAL_INFERENCE_TEMPLATE = """Based on this user's answer, infer what they mean for this calculator question:
+
+Question: {question}
+Question Type: {question_type}
+User Answer: {answer}
+
+Consider the context and common ways people express this information.
+Return only the inferred value, nothing else.
+"""
+
+_CLARIFICATION_TEMPLATE = """Generate a helpful clarification request for this calculator question:
+
+Question: {question}
+Question Type: {question_type}
+User's Answer: {answer}
+
+Create a friendly, helpful message that:
+1. Acknowledges their attempt to answer
+2. Explains what we need more clearly
+3. Provides examples of acceptable formats
+4. Encourages them to try again
+
+Keep it conversational and helpful.
+"""
+
+class CalculatorSession(TypedDict, total=False):
+    """Shape of a calculator session.
+
+    Kept a plain dict at runtime because the same object is shared by
+    reference with ConversationContext.calculator_session (a pydantic dict
+    field) and read dict-style by the orchestrator and API layer; the
+    TypedDict documents the keys without changing that contract.
+    """
+    session_id: str
+    started_at: str
+    current_question_index: int
+    answers: Dict[str, Any]
+    status: str
+    completed_at: str
+    result: Dict[str, Any]
+
 class QuickCalculator:
     """Handles quick insurance needs calculation with conversational flow"""
     
     def __init__(self):
-        self.llm = AsyncOpenAI(
-            api_key=config.openai_api_key
-        )
-        
+        self.llm = get_shared_openai_client()
+
+        # Cap on simultaneous calculator LLM calls - a burst of sessions
+        # otherwise saturates the account rate limit and triggers 429 storms
+        self._llm_sem = asyncio.Semaphore(config.llm_max_concurrency)
+
         # Initialize backend integration
         self.backend_integrator = BackendAPIIntegrator()
         self.life_insurance_calc = LifeInsuranceCalculator(self.backend_integrator)
@@ -119,8 +378,40 @@ class QuickCalculator:
             }
         ]
         
+        # Question-progress metadata derived once - checked on every turn
+        self._required_q_ids = frozenset(
+            q["id"] for q in self.standard_questions if q.get("required", True)
+        )
+        self._total_questions = len(self.standard_questions)
+
         # Active calculator sessions
-        self.active_sessions = {}
+        self.active_sessions: Dict[str, CalculatorSession] = {}
+
+        # Per-session locks: process_answer reads the question index, awaits
+        # LLM calls, then increments - concurrent turns on one session must
+        # not interleave across those await points
+        self._session_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        # Generated questions and welcomes are effectively deterministic per
+        # (question, knowledge level) - there are only a handful of combos, so
+        # after warm-up every new session is served from memory with no LLM call
+        self._contextual_q_cache: Dict[tuple, str] = {}
+        self._welcome_cache: Dict[tuple, str] = {}
+
+        # Per-question bounds with preformatted error strings - these are
+        # checked on every turn, so pay the formatting cost once at startup
+        self._bounds: Dict[str, tuple] = {}
+        for q in self.standard_questions:
+            validation = q.get("validation", {})
+            min_val = validation.get("min")
+            max_val = validation.get("max")
+            if q["type"] == "currency":
+                min_err = f"Amount must be at least ${min_val:,.2f}" if min_val is not None else ""
+                max_err = f"Amount must be at most ${max_val:,.2f}" if max_val is not None else ""
+            else:
+                min_err = f"Value must be at least {min_val}" if min_val is not None else ""
+                max_err = f"Value must be at most {max_val}" if max_val is not None else ""
+            self._bounds[q["id"]] = (min_val, max_val, min_err, max_err)
         
         # Question type handlers
         self.question_types = {
@@ -136,10 +427,32 @@ class QuickCalculator:
             "cash_value_importance": "select"
         }
     
+    async def _llm_call(self, **kwargs):
+        """Create a chat completion under the shared concurrency cap.
+
+        Retries with backoff are handled by the shared client (max_retries on
+        the SDK side); the semaphore keeps the calculator from issuing more
+        simultaneous requests than the account tier tolerates.
+        """
+        async with self._llm_sem:
+            return await self.llm.chat.completions.create(**kwargs)
+
+    def _check_bounds(self, question_id: str, value: float) -> Optional[str]:
+        """Return the preformatted range error for an out-of-bounds value, else None"""
+        bounds = self._bounds.get(question_id)
+        if bounds is None:
+            return None
+        min_val, max_val, min_err, max_err = bounds
+        if min_val is not None and value < min_val:
+            return min_err
+        if max_val is not None and value > max_val:
+            return max_err
+        return None
+
     def _validate_number(self, value: str, validation: Dict[str, Any]) -> Dict[str, Any]:
         """Validate numeric input"""
         try:
-            num_value = float(value.replace(',', '').replace('$', ''))
+            num_value = float(value.translate(_CURRENCY_STRIP))
             min_val = validation.get('min', 0)
             max_val = validation.get('max', float('inf'))
             
@@ -186,12 +499,13 @@ class QuickCalculator:
             # Store session in active_sessions for backup
             self.active_sessions[session_id] = context.calculator_session
             
-            # Generate welcome message
-            welcome_message = await self._generate_welcome_message(context)
-            
-            # Ask first question
-            first_question = await self._ask_next_question(context)
-            
+            # The welcome message and the first question are independent LLM
+            # round-trips - overlap them so session start pays for one, not two
+            welcome_message, first_question = await asyncio.gather(
+                self._generate_welcome_message(context),
+                self._ask_next_question(context)
+            )
+
             # Return a formatted string response instead of a dictionary
             return f"{welcome_message}\n\n{first_question}"
             
@@ -227,51 +541,56 @@ class QuickCalculator:
                     "message": "No active calculator session found"
                 }
             
-            current_question_index = session.get("current_question_index", 0)
-            logger.info(f"🧮 Current question index: {current_question_index}, total questions: {len(self.standard_questions)}")
-            
-            if current_question_index >= len(self.standard_questions):
-                logger.info("🧮 All questions answered, completing calculation...")
-                return await self._complete_calculation(context)
-            
-            current_question = self.standard_questions[current_question_index]
-            question_id = current_question["id"]
-            logger.info(f"🧮 Processing question: {question_id}")
-            
-            # Parse and validate the answer
-            parsed_answer = await self._semantically_parse_answer(answer, current_question)
-            logger.info(f"🧮 Parsed answer: {parsed_answer}")
-            
-            if parsed_answer["valid"]:
-                # Store the answer
-                session["answers"][question_id] = parsed_answer["value"]
-                session["current_question_index"] += 1
-                logger.info(f"🧮 Stored answer for {question_id}: {parsed_answer['value']}")
-                logger.info(f"🧮 Updated question index to: {session['current_question_index']}")
-                logger.info(f"🧮 Total answers stored: {len(session['answers'])}")
-                
-                # Check if we have enough information
-                has_sufficient = await self._has_sufficient_info(session)
-                logger.info(f"🧮 Has sufficient info: {has_sufficient}")
-                
-                if has_sufficient:
-                    logger.info("🧮 Sufficient info, completing calculation...")
+            # Serialize turns per session: the index read, the awaited parsing
+            # calls and the index increment must not interleave with a
+            # concurrent turn (frontend retries double-submit occasionally)
+            async with self._session_locks[session.get("session_id", context.session_id)]:
+                current_question_index = session.get("current_question_index", 0)
+                logger.info(f"🧮 Current question index: {current_question_index}, total questions: {self._total_questions}")
+
+                if current_question_index >= self._total_questions:
+                    logger.info("🧮 All questions answered, completing calculation...")
                     return await self._complete_calculation(context)
+
+                current_question = self.standard_questions[current_question_index]
+                question_id = current_question["id"]
+                logger.info(f"🧮 Processing question: {question_id}")
+
+                # Parse and validate the answer
+                parsed_answer = await self._semantically_parse_answer(answer, current_question)
+                logger.info(f"🧮 Parsed answer: {parsed_answer}")
+
+                if parsed_answer["valid"]:
+                    # Store the answer
+                    session["answers"][question_id] = parsed_answer["value"]
+                    session["current_question_index"] += 1
+                    logger.info(f"🧮 Stored answer for {question_id}: {parsed_answer['value']}")
+                    logger.info(f"🧮 Updated question index to: {session['current_question_index']}")
+                    logger.info(f"🧮 Total answers stored: {len(session['answers'])}")
+
+                    # Check if we have enough information
+                    has_sufficient = await self._has_sufficient_info(session)
+                    logger.info(f"🧮 Has sufficient info: {has_sufficient}")
+
+                    if has_sufficient:
+                        logger.info("🧮 Sufficient info, completing calculation...")
+                        return await self._complete_calculation(context)
+                    else:
+                        # Ask next question
+                        logger.info("🧮 Not enough info, asking next question...")
+                        next_question = await self._ask_next_question(context)
+                        return {
+                            "status": "question",
+                            "message": f"Thank you! {next_question}\n\nReply STOP to end calculator.",
+                            "question": next_question,
+                            "progress": f"{session['current_question_index']}/{self._total_questions} questions completed"
+                        }
                 else:
-                    # Ask next question
-                    logger.info("🧮 Not enough info, asking next question...")
-                    next_question = await self._ask_next_question(context)
-                    return {
-                        "status": "question",
-                        "message": f"Thank you! {next_question}\n\nReply STOP to end calculator.",
-                        "question": next_question,
-                        "progress": f"{session['current_question_index']}/{len(self.standard_questions)} questions completed"
-                    }
-            else:
-                # Handle validation failure
-                logger.warning(f"🧮 Validation failed for {question_id}: {parsed_answer}")
-                return await self._handle_validation_failure(current_question, answer, parsed_answer, context)
-                
+                    # Handle validation failure
+                    logger.warning(f"🧮 Validation failed for {question_id}: {parsed_answer}")
+                    return await self._handle_validation_failure(current_question, answer, parsed_answer, context)
+
+
         except Exception as e:
             logger.error(f"🧮 Error processing answer: {e}")
             import traceback
@@ -298,7 +617,7 @@ class QuickCalculator:
             
             current_question_index = session.get("current_question_index", 0)
             
-            if current_question_index >= len(self.standard_questions):
+            if current_question_index >= self._total_questions:
                 return "All questions have been answered. Calculating your insurance needs..."
             
             current_question = self.standard_questions[current_question_index]
@@ -315,19 +634,18 @@ class QuickCalculator:
     async def _has_sufficient_info(self, session: Dict[str, Any]) -> bool:
         """Check if we have enough information to complete the calculation"""
         try:
-            required_questions = [q for q in self.standard_questions if q.get("required", True)]
-            answered_required = all(q["id"] in session["answers"] for q in required_questions)
-            
+            answered_required = self._required_q_ids.issubset(session["answers"].keys())
+
             # Also check if we have at least 6 questions answered for a reasonable calculation
             total_answered = len(session["answers"])
-            
+
             # Check if we have current life insurance information (important for accurate calculation)
             has_current_coverage_info = (
-                "individual_life" in session["answers"] and 
+                "individual_life" in session["answers"] and
                 "group_life" in session["answers"]
             )
-            
-            logger.info(f"🧮 Sufficient info check - required questions: {[q['id'] for q in required_questions]}")
+
+            logger.info(f"🧮 Sufficient info check - required questions: {sorted(self._required_q_ids)}")
             logger.info(f"🧮 Sufficient info check - session answers: {list(session.get('answers', {}).keys())}")
             logger.info(f"🧮 Sufficient info check - answered_required: {answered_required}, total_answered: {total_answered}")
             logger.info(f"🧮 Sufficient info check - has_current_coverage_info: {has_current_coverage_info}")
@@ -363,20 +681,22 @@ class QuickCalculator:
             total_debt = session["answers"].get("mortgage_balance", 0)
             total_assets = session["answers"].get("total_assets", 0)  # Fixed field name
             
-            # Get current life insurance coverage information
+            # Answers are stored already parsed and typed by the validators, so
+            # these are plain dict reads - no re-parsing on the completion path
             individual_life = session["answers"].get("individual_life", 0)
             group_life = session["answers"].get("group_life", 0)
-            current_total_coverage = float(individual_life or 0) + float(group_life or 0)
-            
+            current_total_coverage = (individual_life or 0) + (group_life or 0)
+
             logger.info(f"🧮 Extracted data - age: {age}, income: {monthly_income}, dependents: {dependents}, debt: {total_debt}, assets: {total_assets}")
             logger.info(f"🧮 Current coverage - individual: {individual_life}, group: {group_life}, total: {current_total_coverage}")
-            
+
             # Convert monthly income to annual
-            annual_income = float(monthly_income) * 12 if monthly_income else 0
-            
+            annual_income = monthly_income * 12 if monthly_income else 0
+
             # Determine financial goals based on answers
+            # (provide_education is a boolean question, so its stored value is True/False)
             goals = []
-            if session["answers"].get("provide_education") == "yes":
+            if session["answers"].get("provide_education"):
                 goals.append("education_funding")
             if session["answers"].get("cash_value_importance") == "yes":
                 goals.append("cash_value_accumulation")
@@ -389,10 +709,10 @@ class QuickCalculator:
             # Call backend calculation using the correct method
             logger.info("🧮 Calling backend calculation...")
             result = await self.life_insurance_calc.calculate_quick_needs(
-                age=int(age) if age else 35,
+                age=age if age else 35,
                 income=annual_income,
-                dependents=int(dependents) if dependents else 0,
-                debt=float(total_debt) if total_debt else 0,
+                dependents=dependents if dependents else 0,
+                debt=total_debt if total_debt else 0,
                 goals=goals_text
             )
             
@@ -447,10 +767,13 @@ class QuickCalculator:
         """Generate a user-friendly response for the calculation result"""
         try:
             prompt = self._build_calculation_response_prompt(result)
-            
-            response = await self.llm.chat.completions.create(
+
+            response = await self._llm_call(
                 model=config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=[
+                    {"role": "system", "content": _CALC_RESPONSE_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
                 temperature=0.7
             )
             
@@ -496,43 +819,28 @@ class QuickCalculator:
             if max_monthly and monthly_savings:
                 percentage = min((monthly_savings / max_monthly) * 100, 100)
         
-            return f"""Generate a comprehensive life insurance calculation response for chat that explains the results clearly.
+            duration_display = "permanent" if "IUL" in str(product) else f"{duration_years} years"
 
-**Calculation Results:**
-- Recommended Coverage: ${coverage:,}
-- Current Coverage: ${current_coverage:,}
-- Coverage Gap: ${coverage_gap:,}
-- Product: {product}
-- Duration: {'permanent' if 'IUL' in str(product) else f'{duration_years} years'}
-- Rationale: {rationale}
-
-**Coverage Breakdown:**
-- Living Expenses: ${estimated_breakdown['living_expenses']:,}
-- Debts: ${estimated_breakdown['debts']:,}
-- Education: ${estimated_breakdown['education']:,}
-- Funeral: ${estimated_breakdown['funeral']:,}
-- Legacy: ${estimated_breakdown['legacy']:,}
-- Other: ${estimated_breakdown['other']:,}
-
-**Monthly Premium Estimate:**
-- Estimated Monthly Premium: ${monthly_premium:,} (if $0, this indicates a calculation estimate)
-- Recommended Monthly Savings: ${monthly_savings:,}
-- Maximum Monthly Contribution: ${max_monthly:,}
-- Savings Level: {percentage:.0f}% of maximum
-
-**Key Factors:**
-- Calculation Method: {calculation_method}
-- Product Recommendation: {product}
-- Coverage Duration: {'permanent' if 'IUL' in str(product) else f'{duration_years} years'}
-
-**Next Steps:**
-1. Review your coverage needs
-2. Compare with existing coverage
-3. Consider different product types
-4. Consult with a licensed insurance professional
+            return _CALC_RESPONSE_USER_TEMPLATE.format_map({
+                "coverage": coverage,
+                "current_coverage": current_coverage,
+                "coverage_gap": coverage_gap,
+                "product": product,
+                "duration_display": duration_display,
+                "rationale": rationale,
+                "living_expenses": estimated_breakdown["living_expenses"],
+                "debts": estimated_breakdown["debts"],
+                "education": estimated_breakdown["education"],
+                "funeral": estimated_breakdown["funeral"],
+                "legacy": estimated_breakdown["legacy"],
+                "other": estimated_breakdown["other"],
+                "monthly_premium": monthly_premium,
+                "monthly_savings": monthly_savings,
+                "max_monthly": max_monthly,
+                "percentage": percentage,
+                "calculation_method": calculation_method
+            })
 
-Please format this as a friendly, conversational response that explains the results clearly and provides actionable next steps."""
-            
         except Exception as e:
             logger.error(f"🧮 Error building calculation response prompt: {e}")
             return "Generate a comprehensive life insurance calculation response."
@@ -576,21 +884,15 @@ Please format this as a friendly, conversational response that explains the resu
             if max_monthly and monthly_savings:
                 percentage = min((monthly_savings / max_monthly) * 100, 100)
             
-            savings_level = ""
-            savings_color = ""
             if percentage <= 25:
-                savings_level = "Low Savings"
-                savings_color = "🟠"
+                savings_level, savings_color = "Low Savings", "🟠"
             elif percentage <= 50:
-                savings_level = "Medium Savings"
-                savings_color = "🔵"
+                savings_level, savings_color = "Medium Savings", "🔵"
             elif percentage <= 75:
-                savings_level = "High Savings"
-                savings_color = "🟢"
+                savings_level, savings_color = "High Savings", "🟢"
             else:
-                savings_level = "Maximum Savings"
-                savings_color = "🟣"
-            
+                savings_level, savings_color = "Maximum Savings", "🟣"
+
             # Product-specific explanations
             if 'IUL' in str(product):
                 product_explanation = "JPM TermVest+ offers two tracks: Term and IUL. The IUL Track provides immediate access to cash value accumulation with tax-deferred growth potential, flexible premiums, and permanent coverage. Your cash value can grow based on market performance while providing a guaranteed death benefit for life."
@@ -598,60 +900,30 @@ Please format this as a friendly, conversational response that explains the resu
             else:
                 product_explanation = "JPM TermVest+ offers two tracks: Term and IUL. The Term Track provides essential protection at an affordable premium for a specified period. You can convert to the IUL Track later to begin building cash value savings with permanent coverage when your financial situation allows."
                 duration_display = f"{duration_years} years"
-            
-            # Chat-optimized response matching frontend results page completely
-            response = f"""🎉 **Your Life Insurance Needs Calculation is Complete!**
 
-**📊 SUMMARY CARDS:**
-• **Recommended Coverage:** ${coverage:,}
-• **Current Coverage:** ${current_coverage:,}
-• **Coverage Gap:** ${coverage_gap:,}
-• **Duration:** {duration_display}
-
-**🏆 PRODUCT RECOMMENDATION:**
-**{product}**
-
-{product_explanation}
-
-**Why this product?** {rationale}
-
-**📋 COVERAGE BREAKDOWN:**
-• Living Expenses: ${estimated_breakdown['living_expenses']:,}
-• Debts: ${estimated_breakdown['debts']:,}
-• Education: ${estimated_breakdown['education']:,}
-• Funeral: ${estimated_breakdown['funeral']:,}
-• Legacy: ${estimated_breakdown['legacy']:,}
-• Other: ${estimated_breakdown['other']:,}
-
-**💰 MONTHLY PREMIUM DETAILS:**
-• **Estimated Monthly Premium:** ${monthly_premium:,} (if $0, this indicates a calculation estimate)
-• **Recommended Monthly Savings:** ${monthly_savings:,}
-• **Maximum Monthly Contribution:** ${max_monthly:,}
-
-**💡 WHAT THIS MEANS:**
-The MEC (Modified Endowment Contract) limit is the maximum monthly contribution that keeps your policy from becoming a modified endowment contract, which has different tax implications.
-
-**📈 SAVINGS LEVEL INDICATOR:**
-{savings_color} **{savings_level}** ({percentage:.0f}% of maximum)
-
-**🎯 PROJECTION ASSUMPTIONS:**
-Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60% in subsequent years. Actual results may vary and are not guaranteed.
-
-**🚀 NEXT STEPS:**
-1. **Review the breakdown** - Does this coverage amount feel right for your situation?
-2. **Ask questions** - I can explain any part of the calculation in more detail
-3. **Explore options** - We can discuss different policy types and features
-4. **Get professional advice** - Consider consulting with a licensed insurance professional
-
-**💬 AVAILABLE ACTIONS:**
-• **Ask Robo-Advisor** - Get more detailed explanations
-• **Start Application** - Begin the application process
-• **Start Over** - Recalculate with different inputs
+            # Chat-optimized response matching frontend results page completely
+            return _DEFAULT_CALC_TEMPLATE.format_map({
+                "coverage": coverage,
+                "current_coverage": current_coverage,
+                "coverage_gap": coverage_gap,
+                "duration_display": duration_display,
+                "product": product,
+                "product_explanation": product_explanation,
+                "rationale": rationale,
+                "living_expenses": estimated_breakdown["living_expenses"],
+                "debts": estimated_breakdown["debts"],
+                "education": estimated_breakdown["education"],
+                "funeral": estimated_breakdown["funeral"],
+                "legacy": estimated_breakdown["legacy"],
+                "other": estimated_breakdown["other"],
+                "monthly_premium": monthly_premium,
+                "monthly_savings": monthly_savings,
+                "max_monthly": max_monthly,
+                "savings_color": savings_color,
+                "savings_level": savings_level,
+                "percentage": percentage
+            })
 
-**What would you like me to explain about this coverage amount or the different components?**"""
-            
-            return response.strip()
-            
         except Exception as e:
             logger.error(f"Error generating default response: {e}")
             return "Your calculation is complete! I've determined your life insurance needs. What would you like to know more about?"
@@ -659,83 +931,92 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
     async def _generate_welcome_message(self, context: ConversationContext) -> str:
         """Generate a personalized welcome message"""
         try:
+            # Without a topic to personalize around the LLM only restates the
+            # per-level examples, so serve those directly
+            if not context.current_topic:
+                return _WELCOME_MESSAGES[context.knowledge_level.value]
+
+            cache_key = (context.knowledge_level.value, context.current_topic or "")
+            cached = self._welcome_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             prompt = self._build_welcome_prompt(context)
-            
-            response = await self.llm.chat.completions.create(
+
+            response = await self._llm_call(
                 model=config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=[
+                    {"role": "system", "content": _WELCOME_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
                 temperature=0.7
             )
-            
-            return response.choices[0].message.content
-            
+
+            message = response.choices[0].message.content
+            self._welcome_cache[cache_key] = message
+            return message
+
         except Exception as e:
             logger.error(f"🧮 Error generating welcome message: {e}")
             return self._get_default_welcome_message()
 
     def _build_welcome_prompt(self, context: ConversationContext) -> str:
-        """Build prompt for welcome message generation - chat-optimized"""
-        return f"""Generate a friendly, conversational welcome message for starting a life insurance needs calculation.
-
-**User Context:** {context.knowledge_level.value} level, current focus: {context.current_topic or 'Insurance Planning'}
-
-**Requirements:**
-- Keep it short and friendly (1-2 sentences max)
-- Make it feel like talking to a real financial advisor
-- Don't be overly formal or technical
-- Encourage them to start
-
-**Examples:**
-- Beginner: "Great! Let's figure out how much life insurance you need. I'll ask you a few simple questions."
-- Intermediate: "Perfect! I'll help you calculate your life insurance needs. This will only take a few minutes."
-- Expert: "Excellent! Let's calculate your life insurance needs. I'll need some basic information from you."
-
-**Generate a friendly welcome message:**
-"""
+        """Build the dynamic user block for welcome message generation"""
+        return _WELCOME_USER_TEMPLATE.format_map({
+            "knowledge_level": context.knowledge_level.value,
+            "current_topic": context.current_topic or "Insurance Planning"
+        })
 
     def _get_default_welcome_message(self) -> str:
         """Default welcome message if LLM generation fails - chat-optimized"""
-        return "Great! Let's calculate your life insurance needs. I'll ask you a few questions to get started."
+        return _DEFAULT_WELCOME
 
     async def _generate_contextual_question(self, question: Dict[str, Any], context: ConversationContext) -> str:
         """Generate a contextual question based on previous answers"""
         try:
+            # Callers sometimes pass a bare session_id; the cache (and prompt)
+            # need the real context, so only key on it when we have one
+            cache_key = None
+            if isinstance(context, ConversationContext):
+                cache_key = (question["id"], context.knowledge_level.value)
+                canned = _CONTEXTUAL_QUESTIONS.get(cache_key)
+                if canned is not None:
+                    return canned
+                if context.knowledge_level == KnowledgeLevel.INTERMEDIATE:
+                    # The base question text already reads at this register
+                    return question["question"]
+                cached = self._contextual_q_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
             prompt = self._build_contextual_question_prompt(question, context)
-            
-            response = await self.llm.chat.completions.create(
+
+            response = await self._llm_call(
                 model=config.openai_model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=[
+                    {"role": "system", "content": _CONTEXTUAL_Q_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
                 temperature=0.7
             )
-            
-            return response.choices[0].message.content
-            
+
+            contextual_question = response.choices[0].message.content
+            if cache_key is not None:
+                self._contextual_q_cache[cache_key] = contextual_question
+            return contextual_question
+
         except Exception as e:
             logger.error(f"Error generating contextual question: {e}")
             return self._get_simple_hint(question)
 
     def _build_contextual_question_prompt(self, question: Dict[str, Any], context: ConversationContext) -> str:
-        """Build prompt for contextual question generation"""
-        return f"""
-        Generate a friendly, contextual question for a life insurance needs assessment.
-        
-        **Base Question:** {question['question']}
-        **Question Type:** {question['type']}
-        **User Context:** {context.knowledge_level.value} level, current focus: {context.current_topic or 'Insurance Planning'}
-        
-        **Requirements:**
-        - Keep the question clear and friendly
-        - Adapt to the user's knowledge level
-        - Make it conversational and engaging
-        - Include context from previous questions if relevant
-        
-        **Examples:**
-        - Beginner: "To help us understand your life insurance needs better, what is your age?"
-        - Intermediate: "For accurate coverage calculation, please tell me your current age."
-        - Expert: "What is your age for the life insurance needs assessment?"
-        
-        **Generate a friendly, contextual version of the question:**
-        """
+        """Build the dynamic user block for contextual question generation"""
+        return _CONTEXTUAL_Q_USER_TEMPLATE.format_map({
+            "question": question["question"],
+            "question_type": question["type"],
+            "knowledge_level": context.knowledge_level.value,
+            "current_topic": context.current_topic or "Insurance Planning"
+        })
 
     def _get_simple_hint(self, question: Dict[str, Any]) -> str:
         """Get a simple, helpful hint for each question - chat-optimized"""
@@ -912,16 +1193,13 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
             
             if question_type == "number":
                 # Try to extract number
-                numbers = re.findall(r'\d+', answer)
+                numbers = _NUMBER_RE.findall(answer)
                 if numbers:
                     value = int(numbers[0])
-                    validation = question.get("validation", {})
-                    
-                    if "min" in validation and value < validation["min"]:
-                        return {"valid": False, "value": None, "error": f"Value must be at least {validation['min']}"}
-                    if "max" in validation and value > validation["max"]:
-                        return {"valid": False, "value": None, "error": f"Value must be at most {validation['max']}"}
-                    
+                    error = self._check_bounds(question_id, value)
+                    if error:
+                        return {"valid": False, "value": None, "error": error}
+
                     return {"valid": True, "value": value, "parsed_from": answer}
         
             elif question_type == "select":
@@ -946,15 +1224,12 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
                 return {"valid": False, "value": None, "error": "Please answer with yes or no"}
             
             elif question_type == "currency":
-                # Try to extract currency amount - more robust pattern
-                # First try the standard pattern
-                currency_pattern = r'\$?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
-                matches = re.findall(currency_pattern, answer)
-                
+                # Try to extract currency amount - standard pattern first,
+                # then a more flexible one for edge cases
+                matches = _CURRENCY_RE.findall(answer)
+
                 if not matches:
-                    # Try a more flexible pattern for edge cases
-                    flexible_pattern = r'\$?([\d,]+(?:\.\d+)?)'
-                    matches = re.findall(flexible_pattern, answer)
+                    matches = _CURRENCY_FLEX_RE.findall(answer)
                 
                 if matches:
                     # Clean up the matched value
@@ -977,18 +1252,15 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
                     
                     try:
                         value = float(value_str)
-                        validation = question.get("validation", {})
-                        
-                        if "min" in validation and value < validation["min"]:
-                            return {"valid": False, "value": None, "error": f"Amount must be at least ${validation['min']:,.2f}"}
-                        if "max" in validation and value > validation["max"]:
-                            return {"valid": False, "value": None, "error": f"Amount must be at most ${validation['max']:,.2f}"}
-                        
+                        error = self._check_bounds(question_id, value)
+                        if error:
+                            return {"valid": False, "value": None, "error": error}
+
                         logger.info(f"🧮 Currency parsing successful: {value}")
                         return {"valid": True, "value": value, "parsed_from": answer}
                     except ValueError:
                         # If float conversion fails, try to extract just the digits
-                        digits_only = re.findall(r'\d', answer)
+                        digits_only = _DIGIT_RE.findall(answer)
                         if digits_only:
                             # Reconstruct a reasonable number
                             value_str = ''.join(digits_only)
@@ -1016,19 +1288,14 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
         """Try to parse answer using semantic understanding with LLM"""
         try:
             logger.info(f"🧮 Trying semantic parsing for answer: '{answer}' to question: {question.get('id', '')}")
-            prompt = f"""
-            Parse this user answer for a calculator question:
-            
-            Question: {question.get('question', '')}
-            Question Type: {question.get('type', '')}
-            Question ID: {question.get('id', '')}
-            User Answer: {answer}
-            
-            Extract the relevant value based on the question type and format it appropriately.
-            Return only the parsed value, nothing else.
-                """
-                
-            response = await self.llm.chat.completions.create(
+            prompt = _SEMANTIC_PARSE_TEMPLATE.format_map({
+                "question": question.get("question", ""),
+                "question_type": question.get("type", ""),
+                "question_id": question.get("id", ""),
+                "answer": answer
+            })
+
+            response = await self._llm_call(
                 model=config.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1
@@ -1057,29 +1324,16 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
             
             if question_type == "number":
                 # Look for numbers in various formats
-                patterns = [
-                    r'\b(\d+)\s*(?:years? old?|y\.?o\.?|age)?\b',  # age patterns
-                    r'\b(\d+)\s*(?:children?|kids?|dependents?)\b',  # dependent patterns
-                    r'\b(\d+)\b'  # general number
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, answer, re.IGNORECASE)
+                for pattern in _NUMBER_PATTERNS:
+                    match = pattern.search(answer)
                     if match:
                         value = int(match.group(1))
                         return {"valid": True, "value": value, "parsed_from": answer}
-            
+
             elif question_type == "currency":
                 # Look for currency in various formats
-                patterns = [
-                    r'\$(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-                    r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*dollars?',
-                    r'(\d+)\s*k\b',  # 50k = $50,000
-                    r'(\d+)\s*m\b'   # 1m = $1,000,000
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, answer, re.IGNORECASE)
+                for pattern in _CURRENCY_PATTERNS:
+                    match = pattern.search(answer)
                     if match:
                         value_str = match.group(1)
                         if 'k' in answer.lower():
@@ -1102,18 +1356,13 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
         """Try to infer answer from context using LLM"""
         try:
             logger.info(f"🧮 Trying contextual inference for answer: '{answer}' to question: {question.get('id', '')}")
-            prompt = f"""
-            Based on this user's answer, infer what they mean for this calculator question:
-            
-            Question: {question.get('question', '')}
-            Question Type: {question.get('type', '')}
-            User Answer: {answer}
-            
-            Consider the context and common ways people express this information.
-            Return only the inferred value, nothing else.
-            """
-            
-            response = await self.llm.chat.completions.create(
+            prompt = _CONTEXTUAL_INFERENCE_TEMPLATE.format_map({
+                "question": question.get("question", ""),
+                "question_type": question.get("type", ""),
+                "answer": answer
+            })
+
+            response = await self._llm_call(
                 model=config.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3
@@ -1139,30 +1388,26 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
         try:
             logger.info(f"🧮 Validating parsed value: '{value}' for question type: {question.get('type', '')}")
             question_type = question.get("type", "text")
-            validation = question.get("validation", {})
-            
+            question_id = question.get("id", "")
+
             if question_type == "number":
                 try:
                     num_value = int(value)
-                    if "min" in validation and num_value < validation["min"]:
-                        return {"valid": False, "value": None, "error": f"Value must be at least {validation['min']}"}
-                    if "max" in validation and num_value > validation["max"]:
-                        return {"valid": False, "value": None, "error": f"Value must be at most {validation['max']}"}
+                    error = self._check_bounds(question_id, num_value)
+                    if error:
+                        return {"valid": False, "value": None, "error": error}
                     return {"valid": True, "value": num_value}
                 except ValueError:
                     return {"valid": False, "value": None, "error": "Invalid number format"}
-            
+
             elif question_type == "currency":
                 try:
-                    # Remove currency symbols and commas
-                    clean_value = value.replace('$', '').replace(',', '')
-                    num_value = float(clean_value)
-                    if "min" in validation and num_value < validation["min"]:
-                        logger.warning(f"🧮 Currency validation failed - below minimum: {num_value} < {validation['min']}")
-                        return {"valid": False, "value": None, "error": f"Amount must be at least ${validation['min']:,.2f}"}
-                    if "max" in validation and num_value > validation["max"]:
-                        logger.warning(f"🧮 Currency validation failed - above maximum: {num_value} > {validation['max']}")
-                        return {"valid": False, "value": None, "error": f"Amount must be at most ${validation['max']:,.2f}"}
+                    # Strip currency symbols, commas and spaces in one pass
+                    num_value = float(value.translate(_CURRENCY_STRIP))
+                    error = self._check_bounds(question_id, num_value)
+                    if error:
+                        logger.warning(f"🧮 Currency validation failed - out of range: {num_value}")
+                        return {"valid": False, "value": None, "error": error}
                     logger.info(f"🧮 Currency validation successful: {num_value}")
                     return {"valid": True, "value": num_value}
                 except ValueError:
@@ -1197,23 +1442,13 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
     async def _generate_clarification_request(self, question: Dict[str, Any], original_answer: str) -> str:
         """Generate a helpful clarification request"""
         try:
-            prompt = f"""
-            Generate a helpful clarification request for this calculator question:
-            
-            Question: {question.get('question', '')}
-            Question Type: {question.get('type', '')}
-            User's Answer: {original_answer}
-            
-            Create a friendly, helpful message that:
-            1. Acknowledges their attempt to answer
-            2. Explains what we need more clearly
-            3. Provides examples of acceptable formats
-            4. Encourages them to try again
-            
-            Keep it conversational and helpful.
-            """
-            
-            response = await self.llm.chat.completions.create(
+            prompt = _CLARIFICATION_TEMPLATE.format_map({
+                "question": question.get("question", ""),
+                "question_type": question.get("type", ""),
+                "answer": original_answer
+            })
+
+            response = await self._llm_call(
                 model=config.openai_model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7
@@ -1235,7 +1470,7 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
             return {
                 "status": session.get("status", "unknown"),
                 "current_question": session.get("current_question_index", 0),
-                "total_questions": len(self.standard_questions),
+                "total_questions": self._total_questions,
                 "answers": session.get("answers", {}),
                 "started_at": session.get("started_at"),
                 "completed_at": session.get("completed_at")
@@ -1250,6 +1485,7 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
         try:
             if session_id in self.active_sessions:
                 del self.active_sessions[session_id]
+                self._session_locks.pop(session_id, None)
                 return True
             return False
             
@@ -1260,24 +1496,127 @@ Projection assumes illustrated rate of 5.5%, allocations of 20% in year 1 and 60
     def cleanup_old_sessions(self, max_age_hours: int = 24) -> int:
         """Clean up old calculator sessions"""
         try:
-            current_time = datetime.utcnow()
+            # Sessions are inserted in start order, so the oldest sit at the
+            # front of the dict - pop from the front until the first session
+            # inside the window instead of scanning and parsing every entry.
+            # started_at is an ISO-8601 string, which sorts in time order.
+            cutoff_iso = (datetime.utcnow() - timedelta(hours=max_age_hours)).isoformat()
             cleaned_count = 0
-            
-            for session_id, session in list(self.active_sessions.items()):
-                if "started_at" in session:
-                    started_time = datetime.fromisoformat(session["started_at"])
-                    age_hours = (current_time - started_time).total_seconds() / 3600
-                    
-                    if age_hours > max_age_hours:
-                        del self.active_sessions[session_id]
-                        cleaned_count += 1
-            
+
+            while self.active_sessions:
+                session_id, session = next(iter(self.active_sessions.items()))
+                if session.get("started_at", cutoff_iso) >= cutoff_iso:
+                    break
+                del self.active_sessions[session_id]
+                self._session_locks.pop(session_id, None)
+                cleaned_count += 1
+
             return cleaned_count
-            
+
         except Exception as e:
             logger.error(f"Error cleaning up old sessions: {e}")
             return 0
 
+    async def warm_caches_via_batch(self, poll_interval_seconds: float = 300.0) -> int:
+        """Pre-populate the question/welcome caches via the OpenAI Batch API.
+
+        Enumerates every (question, knowledge level) combo plus the welcome
+        variants that are not already cached and submits them as one batch job
+        at half the interactive price. Waits for the batch to finish and fills
+        the caches so live sessions never pay for these generations. Meant to
+        run from a nightly maintenance job, not on the request path.
+        """
+        try:
+            requests = []
+            for level in KnowledgeLevel:
+                if (level.value, "") not in self._welcome_cache:
+                    requests.append({
+                        "custom_id": f"welcome|{level.value}",
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": {
+                            "model": config.openai_model,
+                            "messages": [
+                                {"role": "system", "content": _WELCOME_SYSTEM_PROMPT},
+                                {"role": "user", "content": _WELCOME_USER_TEMPLATE.format_map({
+                                    "knowledge_level": level.value,
+                                    "current_topic": "Insurance Planning"
+                                })}
+                            ],
+                            "temperature": 0.7
+                        }
+                    })
+
+                for question in self.standard_questions:
+                    if (question["id"], level.value) in self._contextual_q_cache:
+                        continue
+                    requests.append({
+                        "custom_id": f"question|{question['id']}|{level.value}",
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": {
+                            "model": config.openai_model,
+                            "messages": [
+                                {"role": "system", "content": _CONTEXTUAL_Q_SYSTEM_PROMPT},
+                                {"role": "user", "content": _CONTEXTUAL_Q_USER_TEMPLATE.format_map({
+                                    "question": question["question"],
+                                    "question_type": question["type"],
+                                    "knowledge_level": level.value,
+                                    "current_topic": "Insurance Planning"
+                                })}
+                            ],
+                            "temperature": 0.7
+                        }
+                    })
+
+            if not requests:
+                logger.info("🧮 Warm-cache batch skipped - caches already populated")
+                return 0
+
+            payload = "\n".join(json.dumps(r) for r in requests).encode()
+            batch_file = await self.llm.files.create(
+                file=("quick_calculator_warm_cache.jsonl", payload),
+                purpose="batch"
+            )
+            batch = await self.llm.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            logger.info(f"🧮 Warm-cache batch {batch.id} submitted with {len(requests)} prompts")
+
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                await asyncio.sleep(poll_interval_seconds)
+                batch = await self.llm.batches.retrieve(batch.id)
+
+            if batch.status != "completed" or not batch.output_file_id:
+                logger.error(f"🧮 Warm-cache batch {batch.id} ended with status: {batch.status}")
+                return 0
+
+            output = await self.llm.files.content(batch.output_file_id)
+            warmed = 0
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                content = response["body"]["choices"][0]["message"]["content"]
+                kind, *key_parts = record["custom_id"].split("|")
+                if kind == "welcome":
+                    self._welcome_cache[(key_parts[0], "")] = content
+                else:
+                    self._contextual_q_cache[(key_parts[0], key_parts[1])] = content
+                warmed += 1
+
+            logger.info(f"🧮 Warm-cache batch populated {warmed} cache entries")
+            return warmed
+
+        except Exception as e:
+            logger.error(f"🧮 Error warming caches via batch: {e}")
+            return 0
+
     def close(self):
         """Clean up resources"""
         try:
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
@@ -47,12 +47,16 @@ class KnowledgeLevel(str, Enum):
 
 class ChatMessage(BaseModel):
     """Individual chat message"""
+    # Messages are never reassigned after creation; frozen lets pydantic's core
+    # skip the mutation bookkeeping on this per-turn hot path
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="Unique message ID")
     type: MessageType = Field(..., description="Type of message")
     content: str = Field(..., description="Message content")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Message timestamp")
-    files: Optional[List[str]] = Field(default=[], description="Associated file IDs")
-    metadata: Optional[Dict[str, Any]] = Field(default={}, description="Additional metadata")
+    files: Optional[List[str]] = Field(default_factory=list, description="Associated file IDs")
+    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata")
 
 class IntentResult(BaseModel):
     """Result of intent classification"""
@@ -68,22 +72,26 @@ class IntentResult(BaseModel):
 
 class RoutingDecision(BaseModel):
     """Routing decision for a query"""
+    # Decisions are built once per turn and only read afterwards; frozen
+    # skips pydantic's mutation bookkeeping on the hot routing path
+    model_config = ConfigDict(frozen=True)
+
     route_type: RouteType = Field(..., description="Type of route to take")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence in routing decision")
     reasoning: str = Field(..., description="Reasoning for routing decision")
     tool_type: Optional[str] = Field(None, description="Type of tool if external tool route")
     session_id: Optional[str] = Field(None, description="Session ID for tool integration")
-    metadata: Optional[Dict[str, Any]] = Field(default={}, description="Additional metadata for routing decisions")
+    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata for routing decisions")
 
 class ConversationContext(BaseModel):
     """Context for conversation understanding"""
     session_id: str = Field(..., description="Unique session identifier")
     user_id: Optional[str] = Field(None, description="User identifier")
     knowledge_level: KnowledgeLevel = Field(default=KnowledgeLevel.BEGINNER, description="User's knowledge level")
-    semantic_themes: List[str] = Field(default=[], description="Themes from conversation")
-    user_goals: List[str] = Field(default=[], description="User's expressed goals")
+    semantic_themes: List[str] = Field(default_factory=list, description="Themes from conversation")
+    user_goals: List[str] = Field(default_factory=list, description="User's expressed goals")
     current_topic: Optional[str] = Field(default=None, description="Current conversation topic")
-    previous_calculations: List[Dict[str, Any]] = Field(default=[], description="Previous calculation results")
+    previous_calculations: List[Dict[str, Any]] = Field(default_factory=list, description="Previous calculation results")
     client_context: Optional[str] = Field(default="personal", description="Whether this is personal or client assessment")
     needs_external_search: bool = Field(default=False, description="Whether external search is needed for current query")
     current_intent: Optional[IntentResult] = Field(default=None, description="Current intent for search decision logic")
@@ -104,15 +112,15 @@ class RAGResult(BaseModel):
     """Result from RAG system"""
     response: str = Field(..., description="Generated response")
     quality_score: float = Field(..., ge=0.0, le=1.0, description="Quality score of response")
-    source_documents: List[Dict[str, Any]] = Field(default=[], description="Source documents used")
-    semantic_queries: List[str] = Field(default=[], description="Semantic queries used")
+    source_documents: List[Dict[str, Any]] = Field(default_factory=list, description="Source documents used")
+    semantic_queries: List[str] = Field(default_factory=list, description="Semantic queries used")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence in RAG response")
 
 class SearchResult(BaseModel):
     """Result from external search"""
     response: str = Field(..., description="Generated response from search")
     quality_score: float = Field(..., ge=0.0, le=1.0, description="Quality score of search results")
-    source_results: List[Dict[str, Any]] = Field(default=[], description="Source search results")
+    source_results: List[Dict[str, Any]] = Field(default_factory=list, description="Source search results")
     original_query: str = Field(..., description="Original search query")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence in search response")
 
@@ -121,11 +129,13 @@ class CalculatorSelection(BaseModel):
     selected_calculator: CalculatorType = Field(..., description="Selected calculator type")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence in selection")
     semantic_reasoning: str = Field(..., description="Semantic reasoning for selection")
-    clarification_questions: List[str] = Field(default=[], description="Questions to confirm understanding")
+    clarification_questions: List[str] = Field(default_factory=list, description="Questions to confirm understanding")
     expected_outcome: str = Field(..., description="What they'll get from this calculator")
 
 class ToolResponse(BaseModel):
     """Response from tool integration"""
+    model_config = ConfigDict(frozen=True)
+
     tool_type: str = Field(..., description="Type of tool used")
     action: str = Field(..., description="Action to take")
     url: Optional[str] = Field(None, description="URL for external tools")
@@ -138,15 +148,15 @@ class QualityScore(BaseModel):
     ragas_scores: Optional[Dict[str, float]] = Field(None, description="RAGAS evaluation scores")
     semantic_scores: Optional[Dict[str, float]] = Field(None, description="Semantic quality scores")
     satisfaction_score: Optional[float] = Field(None, ge=0.0, le=1.0, description="Predicted user satisfaction")
-    improvement_areas: List[str] = Field(default=[], description="Areas for improvement")
+    improvement_areas: List[str] = Field(default_factory=list, description="Areas for improvement")
 
 class ComplianceResult(BaseModel):
     """Result of compliance review"""
     original_response: str = Field(..., description="Original response before compliance review")
     final_response: str = Field(..., description="Final response after compliance review")
-    legal_compliance: Dict[str, Any] = Field(default={}, description="Legal compliance details")
-    risk_assessment: Dict[str, Any] = Field(default={}, description="Risk assessment results")
-    disclaimers: List[str] = Field(default=[], description="Required disclaimers")
+    legal_compliance: Dict[str, Any] = Field(default_factory=dict, description="Legal compliance details")
+    risk_assessment: Dict[str, Any] = Field(default_factory=dict, description="Risk assessment results")
+    disclaimers: List[str] = Field(default_factory=list, description="Required disclaimers")
     was_rewritten: bool = Field(default=False, description="Whether response was rewritten")
 
 class ChatResponse(BaseModel):
@@ -154,11 +164,13 @@ class ChatResponse(BaseModel):
     content: str = Field(..., description="Response content")
     quality_score: float = Field(..., ge=0.0, le=1.0, description="Quality score")
     routing_decision: RoutingDecision = Field(..., description="Routing decision made")
-    disclaimers: List[str] = Field(default=[], description="Required disclaimers")
-    metadata: Optional[Dict[str, Any]] = Field(default={}, description="Additional metadata")
+    disclaimers: List[str] = Field(default_factory=list, description="Required disclaimers")
+    metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional metadata")
 
 class FileUpload(BaseModel):
     """File upload information"""
+    model_config = ConfigDict(frozen=True)
+
     file_id: str = Field(..., description="Unique file identifier")
     filename: str = Field(..., description="Original filename")
     file_type: str = Field(..., description="File type/extension")
@@ -170,7 +182,7 @@ class ChatSession(BaseModel):
     """Chat session information"""
     session_id: str = Field(..., description="Unique session identifier")
     user_id: Optional[str] = Field(None, description="User identifier")
-    messages: List[ChatMessage] = Field(default=[], description="Session messages")
+    messages: List[ChatMessage] = Field(default_factory=list, description="Session messages")
     context: ConversationContext = Field(..., description="Session context")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Session creation time")
     last_activity: datetime = Field(default_factory=datetime.utcnow, description="Last activity time")
@@ -1,5 +1,11 @@
+import asyncio
+import heapq
 import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
+from urllib.parse import urlencode
 from .schemas import (
     RoutingDecision, RouteType, IntentResult, ConversationContext,
     RAGResult, SearchResult, ToolResponse
@@ -10,6 +16,43 @@ from .schemas import CalculatorType, IntentCategory
 
 logger = logging.getLogger(__name__)
 
+# Static fallback/error metadata hoisted to module scope - these paths can be
+# taken under retry storms, so don't rebuild the same dicts per failure. They
+# are copied into each RoutingDecision so a caller editing one decision's
+# metadata can't leak into the shared template.
+_ERROR_ROUTING_METADATA = {
+    "error": "Routing system error",
+    "fallback": True
+}
+_FALLBACK_REASON = "RAG and external search unavailable or low quality"
+
+# Calculator-style intents never trigger external search supplementation
+_CALCULATOR_INTENTS = frozenset({
+    IntentCategory.INSURANCE_NEEDS_CALCULATION,
+    IntentCategory.CLIENT_ASSESSMENT_SUPPORT,
+    IntentCategory.PORTFOLIO_INTEGRATION_ANALYSIS
+})
+
+# Deep links are fixed for a session once the knowledge level settles, so
+# later routings in the same session resolve from this cache instead of
+# re-encoding. Module-level free function so the LRU cache never pins an
+# integrator instance.
+@lru_cache(maxsize=2048)
+def _build_deep_link(prefix: str, session_id: str, knowledge_level: str, created_at_iso: str) -> str:
+    query_string = urlencode({
+        "session_id": session_id,
+        "knowledge_level": knowledge_level,
+        "timestamp": created_at_iso
+    })
+    return f"{prefix}&{query_string}"
+
+# Substring probes for the last-resort conversation-management check
+_CONVERSATION_KEYWORDS = (
+    "what did we just talk about", "what were we discussing", "summarize our conversation",
+    "what have we covered", "what was the main topic", "repeat what you said",
+    "how long have we been talking", "what questions have I asked"
+)
+
 class SemanticSmartRouter:
     """Routes queries based on semantic understanding and confidence scores"""
     
@@ -24,119 +67,93 @@ class SemanticSmartRouter:
         """Make routing decisions based on semantic understanding"""
         
         try:
-            logger.info(f"🎯 SMART ROUTER: Starting semantic routing")
-            logger.info(f"🎯 SMART ROUTER: Intent enum: {intent.intent}")
-            logger.info(f"🎯 SMART ROUTER: Intent value: {intent.intent.value}")
-            logger.info(f"🎯 SMART ROUTER: Confidence: {intent.confidence}")
-            logger.info(f"🎯 SMART ROUTER: Reasoning: {intent.reasoning}")
-            
-            # NEW: Handle calculator selection choice
-            if intent.intent == IntentCategory.CALCULATOR_SELECTION_CHOICE:
-                logger.info("🎯 SMART ROUTER: Routing to calculator selection choice")
-                return await self._route_to_calculator_selection(intent, context)
-            
-            # NEW: Handle calculator choice selection
-            elif intent.intent == IntentCategory.CALCULATOR_CHOICE_SELECTED:
-                logger.info("🎯 SMART ROUTER: Routing to selected calculator")
-                return await self._route_to_selected_calculator(intent, context)
-            
-            # ONLY route to calculator if intent ACTUALLY requires calculation
-            elif intent.intent.value in ["insurance_needs_calculation", "portfolio_integration_analysis"]:
-                logger.info("🎯 SMART ROUTER: Routing to calculator (intent.value check)")
-                return await self._route_to_calculator(intent, context)
-            
-            # Check if it's a knowledge-seeking query
-            elif intent.intent.value in ["life_insurance_education", "product_comparison", "scenario_analysis"]:
-                logger.info("🎯 SMART ROUTER: Routing to knowledge sources")
-                return await self._route_to_knowledge_sources(intent, context)
-            
-            # Check if it's client assessment support
-            elif intent.intent.value == "client_assessment_support":
-                logger.info("🎯 SMART ROUTER: Routing to client assessment")
-                return await self._route_to_client_assessment(intent, context)
-            
-            # Check if it's portfolio integration analysis
-            elif intent.intent.value == "portfolio_integration_analysis":
-                logger.info("🎯 SMART ROUTER: Routing to portfolio analysis")
-                return await self._route_to_portfolio_analysis(intent, context)
-            
-            # NEW: Handle conversation management queries
-            elif intent.intent == IntentCategory.CONVERSATION_MANAGEMENT:
-                logger.info("🎯 SMART ROUTER: Routing to conversation management")
-                return await self._route_to_conversation_management(intent, context)
-            
+            logger.info("🎯 SMART ROUTER: Starting semantic routing")
+            logger.info("🎯 SMART ROUTER: Intent enum: %s", intent.intent)
+            logger.info("🎯 SMART ROUTER: Intent value: %s", intent.intent.value)
+            logger.info("🎯 SMART ROUTER: Confidence: %s", intent.confidence)
+            logger.info("🎯 SMART ROUTER: Reasoning: %s", intent.reasoning)
+            
+            # Dispatch through the intent->handler table instead of a chain of
+            # string comparisons; one dict lookup covers every known intent
+            handler = self._INTENT_HANDLERS.get(intent.intent)
+            if handler is not None:
+                logger.info("🎯 SMART ROUTER: Dispatching to %s", handler.__name__)
+                return await handler(self, intent, context)
+
             # Default fallback - but check for conversation management keywords first
-            else:
-                logger.info(f"🎯 SMART ROUTER: Defaulting to fallback for intent: {intent.intent.value}")
-                
-                # LAST RESORT: Check if this might be conversation management despite intent classification
-                query_lower = intent.semantic_goal.lower() if intent.semantic_goal else ""
-                conversation_keywords = [
-                    "what did we just talk about", "what were we discussing", "summarize our conversation",
-                    "what have we covered", "what was the main topic", "repeat what you said",
-                    "how long have we been talking", "what questions have I asked"
-                ]
-                
-                if any(keyword in query_lower for keyword in conversation_keywords):
-                    logger.info("🎯 SMART ROUTER: Detected conversation management keywords in fallback, routing to conversation management")
-                    return await self._route_to_conversation_management(intent, context)
-                
-                return await self._route_to_fallback(intent, context)
-                
+            logger.info("🎯 SMART ROUTER: Defaulting to fallback for intent: %s", intent.intent.value)
+
+            # LAST RESORT: Check if this might be conversation management despite intent classification
+            query_lower = intent.semantic_goal.lower() if intent.semantic_goal else ""
+
+            if any(keyword in query_lower for keyword in _CONVERSATION_KEYWORDS):
+                logger.info("🎯 SMART ROUTER: Detected conversation management keywords in fallback, routing to conversation management")
+                return await self._route_to_conversation_management(intent, context)
+
+            return await self._route_to_fallback(intent, context)
+
+
         except Exception as e:
-            logger.error(f"🎯 SMART ROUTER: Error in smart routing: {e}")
+            logger.error("🎯 SMART ROUTER: Error in smart routing: %s", e)
             import traceback
-            logger.error(f"🎯 SMART ROUTER: Full traceback: {traceback.format_exc()}")
+            logger.error("🎯 SMART ROUTER: Full traceback: %s", traceback.format_exc())
             return self._get_error_routing_decision(intent, context, f"Smart routing error: {str(e)}")
     
     async def _route_to_calculator(self, intent: IntentResult, context: ConversationContext) -> RoutingDecision:
         """Route to appropriate calculator based on intent"""
         
         try:
+            # Bind the repeated attribute chains once - each branch below
+            # reads the same four values
+            calc_type = intent.calculator_type
+            confidence = intent.confidence
+            reasoning = intent.reasoning
+            session_id = context.session_id
+
             # Check if this is a calculator-related query
-            if intent.calculator_type == CalculatorType.QUICK:
+            if calc_type is CalculatorType.QUICK:
                 # Route to quick calculator
-                return RoutingDecision(
+                return RoutingDecision.model_construct(
                     route_type=RouteType.QUICK_CALCULATOR,
-                    confidence=intent.confidence,
-                    reasoning=f"User needs quick calculation: {intent.reasoning}",
+                    confidence=confidence,
+                    reasoning=f"User needs quick calculation: {reasoning}",
                     tool_type=None,
-                    session_id=context.session_id
+                    session_id=session_id
                 )
-            
-            elif intent.calculator_type == CalculatorType.DETAILED:
+
+            elif calc_type is CalculatorType.DETAILED:
                 # Route to detailed assessment tool
-                return RoutingDecision(
+                return RoutingDecision.model_construct(
                     route_type=RouteType.EXTERNAL_TOOL,
-                    confidence=intent.confidence,
-                    reasoning=f"User needs detailed assessment: {intent.reasoning}",
+                    confidence=confidence,
+                    reasoning=f"User needs detailed assessment: {reasoning}",
                     tool_type="detailed_assessment",
-                    session_id=context.session_id
+                    session_id=session_id
                 )
-            
-            elif intent.calculator_type == CalculatorType.PORTFOLIO:
+
+            elif calc_type is CalculatorType.PORTFOLIO:
                 # Route to portfolio analysis tool
-                return RoutingDecision(
+                return RoutingDecision.model_construct(
                     route_type=RouteType.EXTERNAL_TOOL,
-                    confidence=intent.confidence,
-                    reasoning=f"User needs portfolio analysis: {intent.reasoning}",
+                    confidence=confidence,
+                    reasoning=f"User needs portfolio analysis: {reasoning}",
                     tool_type="portfolio_analysis",
-                    session_id=context.session_id
+                    session_id=session_id
                 )
-            
+
             else:
                 # No calculator needed
-                return RoutingDecision(
+                return RoutingDecision.model_construct(
                     route_type=RouteType.RAG,
-                    confidence=intent.confidence,
-                    reasoning=f"No calculation needed: {intent.reasoning}",
+                    confidence=confidence,
+                    reasoning=f"No calculation needed: {reasoning}",
                     tool_type=None,
-                    session_id=context.session_id
+                    session_id=session_id
                 )
                 
         except Exception as e:
-            logger.error(f"Error routing to calculator: {e}")
-            return RoutingDecision(
+            logger.error("Error routing to calculator: %s", e)
+            return RoutingDecision.model_construct(
                 route_type=RouteType.BASE_LLM,
                 confidence=0.5,
                 reasoning=f"Calculator routing error: {str(e)}",
@@ -150,7 +167,7 @@ class SemanticSmartRouter:
             # Set calculator state to selecting
             context.calculator_state = "selecting"
             
-            return RoutingDecision(
+            return RoutingDecision.model_construct(
                 route_type=RouteType.CALCULATOR_SELECTION,
                 confidence=intent.confidence,
                 reasoning="User needs to choose calculator type",
@@ -163,7 +180,7 @@ class SemanticSmartRouter:
             )
             
         except Exception as e:
-            logger.error(f"Error routing to calculator selection: {e}")
+            logger.error("Error routing to calculator selection: %s", e)
             return self._get_error_routing_decision(intent, context, f"Calculator selection routing failed: {str(e)}")
     
     async def _route_to_selected_calculator(self, intent: IntentResult, context: ConversationContext) -> RoutingDecision:
@@ -175,13 +192,13 @@ class SemanticSmartRouter:
             context.calculator_type = selected_calc
             context.calculator_state = "active"
             
-            if selected_calc == CalculatorType.QUICK:
+            if selected_calc is CalculatorType.QUICK:
                 # Start quick calculator session
                 from datetime import datetime
                 session_id = f"calc_{int(datetime.utcnow().timestamp())}"
                 context.calculator_session = {"session_id": session_id, "type": "quick"}
                 
-                return RoutingDecision(
+                return RoutingDecision.model_construct(
                     route_type=RouteType.QUICK_CALCULATOR,
                     confidence=1.0,
                     reasoning=f"User selected {selected_calc} calculator",
@@ -190,15 +207,15 @@ class SemanticSmartRouter:
                     metadata={"calculator_session_id": session_id}
                 )
             
-            elif selected_calc == CalculatorType.DETAILED:
+            elif selected_calc is CalculatorType.DETAILED:
                 return await self._route_to_client_assessment(intent, context)
             
-            elif selected_calc == CalculatorType.PORTFOLIO:
+            elif selected_calc is CalculatorType.PORTFOLIO:
                 return await self._route_to_portfolio_analysis(intent, context)
             
             else:
                 # Fallback to RAG if calculator type is unclear
-                return RoutingDecision(
+                return RoutingDecision.model_construct(
                     route_type=RouteType.RAG,
                     confidence=0.5,
                     reasoning=f"Unclear calculator type: {selected_calc}",
@@ -207,31 +224,29 @@ class SemanticSmartRouter:
                 )
                 
         except Exception as e:
-            logger.error(f"Error routing to selected calculator: {e}")
+            logger.error("Error routing to selected calculator: %s", e)
             return self._get_error_routing_decision(intent, context, f"Selected calculator routing failed: {str(e)}")
     
     async def _route_to_knowledge_sources(self, intent: IntentResult, context: ConversationContext) -> RoutingDecision:
         """Route knowledge queries to RAG system with optional external search"""
         try:
-            logger.info(f"Routing knowledge query: {intent.intent.value}")
+            logger.info("Routing knowledge query: %s", intent.intent.value)
             
             # For calculator intents, NEVER use external search
-            if intent.intent in [IntentCategory.INSURANCE_NEEDS_CALCULATION, 
-                               IntentCategory.CLIENT_ASSESSMENT_SUPPORT, 
-                               IntentCategory.PORTFOLIO_INTEGRATION_ANALYSIS]:
+            if intent.intent in _CALCULATOR_INTENTS:
                 logger.info("Calculator intent detected - bypassing external search")
                 needs_search = False
             else:
                 # Use the intent classifier's decision about external search
                 needs_search = intent.needs_external_search
-                logger.info(f"Intent classifier determined search need: {needs_search}")
+                logger.info("Intent classifier determined search need: %s", needs_search)
             
             # Determine route type based on intent and context
             # Don't call RAG here - let the orchestrator handle RAG execution
             route_type = RouteType.RAG
             reasoning = f"Knowledge query routed to RAG system for comprehensive response"
             
-            return RoutingDecision(
+            return RoutingDecision.model_construct(
                 route_type=route_type,
                 confidence=intent.confidence,
                 reasoning=reasoning,
@@ -244,20 +259,34 @@ class SemanticSmartRouter:
             )
             
         except Exception as e:
-            logger.error(f"Error routing to knowledge sources: {e}")
+            logger.error("Error routing to knowledge sources: %s", e)
             return self._get_error_routing_decision(intent, context, f"Knowledge routing failed: {str(e)}")
     
-    async def _route_to_client_assessment(self, intent: IntentResult, context: ConversationContext) -> RoutingDecision:
-        """Route to external detailed client assessment tool"""
-        
+    # Reasoning and error label per external tool - the two tool routes are
+    # otherwise identical, so a single coroutine handles both
+    _EXTERNAL_TOOL_ROUTES = {
+        "detailed_assessment": (
+            "Comprehensive client assessment requires detailed external tool",
+            "Client assessment routing failed"
+        ),
+        "portfolio_analysis": (
+            "Portfolio-focused analysis requires specialized external tool",
+            "Portfolio analysis routing failed"
+        )
+    }
+
+    async def _route_to_external_tool(self, intent: IntentResult, context: ConversationContext, tool_type: str) -> RoutingDecision:
+        """Route to an external tool with context preservation"""
+
+        reasoning, error_label = self._EXTERNAL_TOOL_ROUTES[tool_type]
         try:
-            tool_response = await self.tool_integrator.route_to_external_tool("detailed_assessment", context)
-            
-            return RoutingDecision(
+            tool_response = await self.tool_integrator.route_to_external_tool(tool_type, context)
+
+            return RoutingDecision.model_construct(
                 route_type=RouteType.EXTERNAL_TOOL,
                 confidence=intent.confidence,
-                reasoning="Comprehensive client assessment requires detailed external tool",
-                tool_type="detailed_assessment",
+                reasoning=reasoning,
+                tool_type=tool_type,
                 session_id=context.session_id,
                 metadata={
                     "tool_url": tool_response.url,
@@ -265,40 +294,25 @@ class SemanticSmartRouter:
                     "action": tool_response.action
                 }
             )
-            
+
         except Exception as e:
-            logger.error(f"Error routing to client assessment: {e}")
-            return self._get_error_routing_decision(intent, context, f"Client assessment routing failed: {str(e)}")
-    
+            logger.error("Error routing to external tool %s: %s", tool_type, e)
+            return self._get_error_routing_decision(intent, context, f"{error_label}: {str(e)}")
+
+    async def _route_to_client_assessment(self, intent: IntentResult, context: ConversationContext) -> RoutingDecision:
+        """Route to external detailed client assessment tool"""
+        return await self._route_to_external_tool(intent, context, "detailed_assessment")
+
     async def _route_to_portfolio_analysis(self, intent: IntentResult, context: ConversationContext) -> RoutingDecision:
         """Route to external portfolio analysis tool"""
-        
-        try:
-            tool_response = await self.tool_integrator.route_to_external_tool("portfolio_analysis", context)
-            
-            return RoutingDecision(
-                route_type=RouteType.EXTERNAL_TOOL,
-                confidence=intent.confidence,
-                reasoning="Portfolio-focused analysis requires specialized external tool",
-                tool_type="portfolio_analysis",
-                session_id=context.session_id,
-                metadata={
-                    "tool_url": tool_response.url,
-                    "tool_message": tool_response.message,
-                    "action": tool_response.action
-                }
-            )
-            
-        except Exception as e:
-            logger.error(f"Error routing to portfolio analysis: {e}")
-            return self._get_error_routing_decision(intent, context, f"Portfolio analysis routing failed: {str(e)}")
+        return await self._route_to_external_tool(intent, context, "portfolio_analysis")
     
     async def _route_to_conversation_management(self, intent: IntentResult, context: ConversationContext) -> RoutingDecision:
         """Route conversation management queries to the memory system"""
         try:
             logger.info("🎯 SMART ROUTER: Creating conversation management routing decision")
             
-            return RoutingDecision(
+            return RoutingDecision.model_construct(
                 route_type=RouteType.CONVERSATION_MANAGEMENT,
                 confidence=intent.confidence,
                 reasoning=f"User is asking about conversation state: {intent.reasoning}",
@@ -307,21 +321,21 @@ class SemanticSmartRouter:
             )
             
         except Exception as e:
-            logger.error(f"🎯 SMART ROUTER: Error routing to conversation management: {e}")
+            logger.error("🎯 SMART ROUTER: Error routing to conversation management: %s", e)
             import traceback
-            logger.error(f"🎯 SMART ROUTER: Full traceback: {traceback.format_exc()}")
+            logger.error("🎯 SMART ROUTER: Full traceback: %s", traceback.format_exc())
             return self._get_error_routing_decision(intent, context, f"Conversation management routing failed: {str(e)}")
     
     async def _route_to_fallback(self, intent: IntentResult, context: ConversationContext) -> RoutingDecision:
         """Route to base LLM fallback"""
         
-        return RoutingDecision(
+        return RoutingDecision.model_construct(
             route_type=RouteType.BASE_LLM,
             confidence=0.5,
             reasoning="Using base LLM for general knowledge and fallback responses",
             session_id=context.session_id,
             metadata={
-                "fallback_reason": "RAG and external search unavailable or low quality",
+                "fallback_reason": _FALLBACK_REASON,
                 "intent_confidence": intent.confidence
             }
         )
@@ -329,71 +343,107 @@ class SemanticSmartRouter:
     def _get_error_routing_decision(self, intent: IntentResult, context: ConversationContext, error_reason: str) -> RoutingDecision:
         """Get routing decision for error cases"""
         
-        return RoutingDecision(
+        return RoutingDecision.model_construct(
             route_type=RouteType.BASE_LLM,
             confidence=0.3,
             reasoning=f"Error in routing system, using base LLM fallback: {error_reason}",
             session_id=context.session_id,
-            metadata={
-                "error": "Routing system error",
-                "fallback": True
-            }
+            metadata=dict(_ERROR_ROUTING_METADATA)
         )
 
+    # Intent -> handler dispatch table. Defined after the handlers so the
+    # names resolve; unknown intents fall through to the keyword/fallback
+    # logic in route_query_semantically. Calculator-style intents route
+    # through _route_to_calculator, which applies the calculator_type check.
+    _INTENT_HANDLERS = {
+        IntentCategory.CALCULATOR_SELECTION_CHOICE: _route_to_calculator_selection,
+        IntentCategory.CALCULATOR_CHOICE_SELECTED: _route_to_selected_calculator,
+        IntentCategory.INSURANCE_NEEDS_CALCULATION: _route_to_calculator,
+        IntentCategory.PORTFOLIO_INTEGRATION_ANALYSIS: _route_to_calculator,
+        IntentCategory.LIFE_INSURANCE_EDUCATION: _route_to_knowledge_sources,
+        IntentCategory.PRODUCT_COMPARISON: _route_to_knowledge_sources,
+        IntentCategory.SCENARIO_ANALYSIS: _route_to_knowledge_sources,
+        IntentCategory.CLIENT_ASSESSMENT_SUPPORT: _route_to_client_assessment,
+        IntentCategory.CONVERSATION_MANAGEMENT: _route_to_conversation_management,
+    }
+
+@dataclass(frozen=True, slots=True)
+class ToolInfo:
+    """Static metadata for one external tool"""
+    url: str
+    name: str
+    description: str
+    estimated_time: str
+    output: str
+
+# client_assessment is an alias for detailed_assessment, so the two keys
+# share the same (immutable) record
+_DETAILED_ASSESSMENT_TOOL = ToolInfo(
+    url="/assessment",
+    name="New Client Detailed Assessment",
+    description="Comprehensive 50+ question assessment for thorough financial planning",
+    estimated_time="15-20 minutes",
+    output="Detailed report with multiple scenarios and recommendations"
+)
+
 class ToolIntegrator:
     """Handles integration with external tools and calculators"""
-    
+
     def __init__(self):
-        self.tool_urls = {
-            "detailed_assessment": "/assessment",
-            "client_assessment": "/assessment",  # Alias for client_assessment
-            "portfolio_analysis": "/portfolio-assessment",
-            "quick_calculator": "/quick-calculator"
+        self._tools = {
+            "detailed_assessment": _DETAILED_ASSESSMENT_TOOL,
+            "client_assessment": _DETAILED_ASSESSMENT_TOOL,
+            "portfolio_analysis": ToolInfo(
+                url="/portfolio-assessment",
+                name="Portfolio Analysis Calculator",
+                description="Portfolio-focused insurance analysis with investment context",
+                estimated_time="10-15 minutes",
+                output="Portfolio analysis report with insurance integration"
+            ),
+            "quick_calculator": ToolInfo(
+                url="/quick-calculator",
+                name="Quick Insurance Calculator",
+                description="Fast 5-question estimate for immediate planning needs",
+                estimated_time="2-3 minutes",
+                output="Immediate coverage estimate with basic recommendations"
+            )
         }
-        
-        self.tool_descriptions = {
-            "detailed_assessment": {
-                "name": "New Client Detailed Assessment",
-                "description": "Comprehensive 50+ question assessment for thorough financial planning",
-                "estimated_time": "15-20 minutes",
-                "output": "Detailed report with multiple scenarios and recommendations"
-            },
-            "client_assessment": {
-                "name": "New Client Detailed Assessment",
-                "description": "Comprehensive 50+ question assessment for thorough financial planning",
-                "estimated_time": "15-20 minutes",
-                "output": "Detailed report with multiple scenarios and recommendations"
-            },
-            "portfolio_analysis": {
-                "name": "Portfolio Analysis Calculator",
-                "description": "Portfolio-focused insurance analysis with investment context",
-                "estimated_time": "10-15 minutes",
-                "output": "Portfolio analysis report with insurance integration"
-            },
-            "quick_calculator": {
-                "name": "Quick Insurance Calculator",
-                "description": "Fast 5-question estimate for immediate planning needs",
-                "estimated_time": "2-3 minutes",
-                "output": "Immediate coverage estimate with basic recommendations"
-            }
+
+        # Routing messages are pure functions of the static tool metadata
+        # above, so render them once here instead of per routing call
+        self._tool_messages = {
+            tool_type: self._render_tool_routing_message(tool_type, tool_info)
+            for tool_type, tool_info in self._tools.items()
         }
-    
+
+        # The source parameter never varies, so bake it into a per-tool deep
+        # link prefix; only the session-specific fields get encoded per call
+        self._deep_link_prefix = {
+            tool_type: f"{tool_info.url}?source=robo_advisor_chatbot"
+            for tool_type, tool_info in self._tools.items()
+        }
+
+        # Returned-report store (in production, use database) and its expiry
+        # heap - initialized here so the accessors don't need hasattr probes
+        self._returned_reports: Dict[str, Dict[str, Any]] = {}
+        self._report_expiry_heap: List[tuple] = []
+        self._cleanup_task: Optional[asyncio.Task] = None
+
     async def route_to_external_tool(self, tool_type: str, context: ConversationContext) -> ToolResponse:
         """Route user to external tool with context preservation"""
         
         try:
-            if tool_type not in self.tool_urls:
+            tool_info = self._tools.get(tool_type)
+            if tool_info is None:
                 raise ValueError(f"Unknown tool type: {tool_type}")
             
-            tool_info = self.tool_descriptions[tool_type]
-            
             # Generate deep link with session context
             deep_link = self._generate_deep_link(tool_type, context)
             
             # Create routing message
             message = self._generate_tool_routing_message(tool_type, context, tool_info)
             
-            return ToolResponse(
+            return ToolResponse.model_construct(
                 tool_type=tool_type,
                 action="redirect_to_external_tool",
                 url=deep_link,
@@ -402,52 +452,52 @@ class ToolIntegrator:
             )
             
         except Exception as e:
-            logger.error(f"Error routing to external tool {tool_type}: {e}")
+            logger.error("Error routing to external tool %s: %s", tool_type, e)
             raise
     
     def _generate_deep_link(self, tool_type: str, context: ConversationContext) -> str:
         """Generate deep link to external tool with context"""
         
         try:
-            base_url = self.tool_urls[tool_type]
-            
-            # Add context parameters
-            context_params = {
-                "session_id": context.session_id,
-                "knowledge_level": context.knowledge_level.value,
-                "source": "robo_advisor_chatbot",
-                "timestamp": context.created_at.isoformat()
-            }
-            
-            # Build query string
-            query_parts = [f"{k}={v}" for k, v in context_params.items()]
-            query_string = "&".join(query_parts)
-            
-            deep_link = f"{base_url}?{query_string}"
-            
-            return deep_link
+            # urlencode (inside the cached builder) escapes values, so session
+            # ids or timestamps containing '&'/'=' /'+' can't corrupt the link
+            return _build_deep_link(
+                self._deep_link_prefix[tool_type],
+                context.session_id,
+                context.knowledge_level.value,
+                context.created_at.isoformat()
+            )
             
         except Exception as e:
-            logger.error(f"Error generating deep link: {e}")
-            return self.tool_urls.get(tool_type, "/")
+            logger.error("Error generating deep link: %s", e)
+            tool_info = self._tools.get(tool_type)
+            return tool_info.url if tool_info is not None else "/"
     
     def _generate_tool_routing_message(
-        self, 
-        tool_type: str, 
-        context: ConversationContext, 
-        tool_info: Dict[str, Any]
+        self,
+        tool_type: str,
+        context: ConversationContext,
+        tool_info: ToolInfo
     ) -> str:
         """Generate message explaining tool routing"""
-        
+
+        message = self._tool_messages.get(tool_type)
+        if message is not None:
+            return message
+        return f"Redirecting to {tool_type} tool..."
+
+    def _render_tool_routing_message(self, tool_type: str, tool_info: ToolInfo) -> str:
+        """Render the routing message for one tool - called once at init"""
+
         try:
             if tool_type == "detailed_assessment":
                 return f"""
-                **Redirecting to {tool_info['name']}**
+                **Redirecting to {tool_info.name}**
                 
-                This comprehensive assessment will ask you 50+ detailed questions about your financial situation, goals, and needs. It typically takes {tool_info['estimated_time']} to complete.
+                This comprehensive assessment will ask you 50+ detailed questions about your financial situation, goals, and needs. It typically takes {tool_info.estimated_time} to complete.
                 
                 **What you'll get:**
-                • {tool_info['output']}
+                • {tool_info.output}
                 • Personalized recommendations
                 • Multiple coverage scenarios
                 • Detailed financial planning insights
@@ -455,17 +505,17 @@ class ToolIntegrator:
                 **After completion:**
                 Your report will be sent back to this chat where you can ask questions and get additional guidance.
                 
-                [Click here to start the assessment]({self.tool_urls[tool_type]})
+                [Click here to start the assessment]({tool_info.url})
                 """
             
             elif tool_type == "portfolio_analysis":
                 return f"""
-                **Redirecting to {tool_info['name']}**
+                **Redirecting to {tool_info.name}**
                 
-                This specialized tool analyzes your insurance needs in the context of your investment portfolio. It typically takes {tool_info['estimated_time']} to complete.
+                This specialized tool analyzes your insurance needs in the context of your investment portfolio. It typically takes {tool_info.estimated_time} to complete.
                 
                 **What you'll get:**
-                • {tool_info['output']}
+                • {tool_info.output}
                 • Portfolio-insurance integration analysis
                 • Risk management recommendations
                 • Holistic financial planning insights
@@ -473,23 +523,23 @@ class ToolIntegrator:
                 **After completion:**
                 Your portfolio analysis report will be sent back to this chat for further discussion and Q&A.
                 
-                [Click here to start the analysis]({self.tool_urls[tool_type]})
+                [Click here to start the analysis]({tool_info.url})
                 """
             
             else:
                 return f"""
-                **Redirecting to {tool_info['name']}**
+                **Redirecting to {tool_info.name}**
                 
-                This tool will help you {tool_info['description'].lower()}. It typically takes {tool_info['estimated_time']} to complete.
+                This tool will help you {tool_info.description.lower()}. It typically takes {tool_info.estimated_time} to complete.
                 
                 **What you'll get:**
-                • {tool_info['output']}
+                • {tool_info.output}
                 
-                [Click here to start]({self.tool_urls[tool_type]})
+                [Click here to start]({tool_info.url})
                 """
                 
         except Exception as e:
-            logger.error(f"Error generating tool routing message: {e}")
+            logger.error("Error generating tool routing message: %s", e)
             return f"Redirecting to {tool_type} tool..."
     
     async def handle_report_return(self, session_id: str, report_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -508,14 +558,15 @@ class ToolIntegrator:
                 "download_url": report_data.get("download_url", ""),
                 "metadata": report_data.get("metadata", {})
             }
-            
-            # Store report for chat context (in production, use database)
-            if not hasattr(self, '_returned_reports'):
-                self._returned_reports = {}
-            
+
+            # Receipt timestamp drives expiry as a raw float compare, so
+            # cleanup never has to parse the tool-supplied generated_at string
+            processed_report["_received_at_ts"] = time.time()
+
             self._returned_reports[session_id] = processed_report
+            heapq.heappush(self._report_expiry_heap, (processed_report["_received_at_ts"], session_id))
             
-            logger.info(f"Processed returned report for session {session_id}")
+            logger.info("Processed returned report for session %s", session_id)
             
             return {
                 "status": "success",
@@ -530,7 +581,7 @@ class ToolIntegrator:
             }
             
         except Exception as e:
-            logger.error(f"Error handling report return: {e}")
+            logger.error("Error handling report return: %s", e)
             return {
                 "status": "error",
                 "message": f"Error processing returned report: {str(e)}"
@@ -539,46 +590,45 @@ class ToolIntegrator:
     def get_returned_report(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get returned report for a session"""
         
-        try:
-            if hasattr(self, '_returned_reports') and session_id in self._returned_reports:
-                return self._returned_reports[session_id]
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error getting returned report: {e}")
-            return None
+        return self._returned_reports.get(session_id)
     
     def cleanup_returned_reports(self, max_age_hours: int = 24) -> int:
         """Clean up old returned reports"""
         
         try:
             cleaned_count = 0
-            current_time = datetime.utcnow()
-            
-            if hasattr(self, '_returned_reports'):
-                session_ids_to_remove = []
-                
-                for session_id, report in self._returned_reports.items():
-                    if "generated_at" in report:
-                        try:
-                            generated_time = datetime.fromisoformat(report["generated_at"])
-                            age_hours = (current_time - generated_time).total_seconds() / 3600
-                            
-                            if age_hours > max_age_hours:
-                                session_ids_to_remove.append(session_id)
-                        except ValueError:
-                            # Invalid timestamp, remove report
-                            session_ids_to_remove.append(session_id)
-                
-                for session_id in session_ids_to_remove:
+            cutoff = time.time() - max_age_hours * 3600
+
+            heap = self._report_expiry_heap
+            while heap and heap[0][0] < cutoff:
+                received_ts, session_id = heapq.heappop(heap)
+                report = self._returned_reports.get(session_id)
+                # A session that returned a newer report leaves a stale heap
+                # entry behind; only evict if this entry still describes it
+                if report is not None and report.get("_received_at_ts") == received_ts:
                     del self._returned_reports[session_id]
                     cleaned_count += 1
-            
-            logger.info(f"Cleaned up {cleaned_count} old returned reports")
+
+            logger.info("Cleaned up %s old returned reports", cleaned_count)
             return cleaned_count
             
         except Exception as e:
-            logger.error(f"Error cleaning up returned reports: {e}")
+            logger.error("Error cleaning up returned reports: %s", e)
             return 0
-    
- 
\ No newline at end of file
+
+    def start_cleanup_task(self, interval_seconds: float = 3600.0) -> None:
+        """Start the periodic report cleanup loop - call once from app startup"""
+
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop(interval_seconds))
+            logger.info("Started returned-report cleanup task (every %ss)", interval_seconds)
+
+    async def _cleanup_loop(self, interval_seconds: float) -> None:
+        """Sweep expired returned reports on a schedule instead of per request"""
+
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.cleanup_returned_reports()
+            except Exception as e:
+                logger.error("Error in returned-report cleanup loop: %s", e)
@@ -1,9 +1,11 @@
 import logging
-import json
 import uuid
+import msgpack
+import orjson
 from typing import List, Dict, Any, Optional
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 import asyncio
 from datetime import datetime
@@ -28,7 +30,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # FastAPI app
-app = FastAPI(title="Robo-Advisor Chatbot API", version="1.0.0")
+app = FastAPI(title="Robo-Advisor Chatbot API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -132,6 +134,9 @@ async def startup_event():
             file_processor=file_processor
         )
         
+        # Periodic sweep of expired returned reports off the request path
+        tool_integrator.start_cleanup_task()
+
         logger.info("✅ Robo-Advisor Chatbot initialized successfully!")
         
         # Auto-ingest documents if RAG database is empty
@@ -188,27 +193,37 @@ class ConnectionManager:
     
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
-    
+        # Sessions whose client negotiated the msgpack subprotocol get binary
+        # frames; everyone else keeps text JSON
+        self.msgpack_sessions: set = set()
+
     async def connect(self, websocket: WebSocket, session_id: str):
-        """Connect a new WebSocket client"""
-        
-        await websocket.accept()
+        """Connect a new WebSocket client, negotiating the wire format"""
+
+        use_msgpack = "msgpack" in (websocket.scope.get("subprotocols") or [])
+        await websocket.accept(subprotocol="msgpack" if use_msgpack else None)
         self.active_connections[session_id] = websocket
-        logger.info(f"WebSocket connected for session: {session_id}")
-    
+        if use_msgpack:
+            self.msgpack_sessions.add(session_id)
+        logger.info(f"WebSocket connected for session: {session_id} (msgpack={use_msgpack})")
+
     def disconnect(self, session_id: str):
         """Disconnect a WebSocket client"""
-        
-        if session_id in self.active_connections:
-            del self.active_connections[session_id]
+
+        if self.active_connections.pop(session_id, None) is not None:
+            self.msgpack_sessions.discard(session_id)
             logger.info(f"WebSocket disconnected for session: {session_id}")
-    
+
     async def send_message(self, session_id: str, message: Dict[str, Any]):
-        """Send message to a specific WebSocket client"""
-        
-        if session_id in self.active_connections:
+        """Send message to a specific WebSocket client in its negotiated format"""
+
+        websocket = self.active_connections.get(session_id)
+        if websocket is not None:
             try:
-                await self.active_connections[session_id].send_text(json.dumps(message))
+                if session_id in self.msgpack_sessions:
+                    await websocket.send_bytes(msgpack.packb(message))
+                else:
+                    await websocket.send_text(orjson.dumps(message).decode())
             except Exception as e:
                 logger.error(f"Error sending message to session {session_id}: {e}")
                 self.disconnect(session_id)
@@ -224,9 +239,14 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     
     try:
         while True:
-            # Receive message
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
+            # Receive message (binary msgpack frame or text JSON)
+            raw = await websocket.receive()
+            if raw["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(raw.get("code", 1000))
+            if raw.get("bytes") is not None:
+                message_data = msgpack.unpackb(raw["bytes"])
+            else:
+                message_data = orjson.loads(raw["text"])
             
             logger.info(f"Received WebSocket message: {message_data}")
             
@@ -246,7 +266,10 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 response = await chatbot_orchestrator.process_message(message, session_id)
                 
                 logger.info(f"Orchestrator response received: {len(response.content)} characters")
-                
+
+                # One timestamp per turn; every branch below stamps the same value
+                now_iso = datetime.utcnow().isoformat()
+
                 # Handle different routing decisions
                 if response.routing_decision.route_type == RouteType.QUICK_CALCULATOR:
                     # Quick calculator response
@@ -257,7 +280,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                         "routing_decision": response.routing_decision.dict(),
                         "disclaimers": [],  # No disclaimers for calculator responses
                         "session_id": session_id,
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": now_iso,
                         "routing_type": "quick_calculator",
                         "calculator_session": response.metadata.get("calculator_session") if response.metadata else None
                     }
@@ -271,7 +294,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                         "routing_decision": response.routing_decision.dict(),
                         "disclaimers": [],  # No disclaimers for calculator selection
                         "session_id": session_id,
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": now_iso,
                         "routing_type": "calculator_selection",
                         "needs_calculator_selection": True,
                         "suggested_calculator": response.routing_decision.metadata.get("suggested_calculator") if response.routing_decision.metadata else "quick"
@@ -286,7 +309,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                         "routing_decision": response.routing_decision.dict(),
                         "disclaimers": response.disclaimers,
                         "session_id": session_id,
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": now_iso,
                         "routing_type": "external_tool",
                         "tool_type": response.routing_decision.tool_type
                     }
@@ -300,14 +323,14 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                         "routing_decision": response.routing_decision.dict(),
                         "disclaimers": response.disclaimers,
                         "session_id": session_id,
-                        "timestamp": datetime.utcnow().isoformat(),
+                        "timestamp": now_iso,
                         "routing_type": response.routing_decision.route_type.value
                     }
                 
                 logger.info(f"Sending WebSocket response back to client: {len(final_response['content'])} characters")
                 
-                # Send response back to client
-                await websocket.send_text(json.dumps(final_response))
+                # Send response back to client in its negotiated wire format
+                await manager.send_message(session_id, final_response)
                 
                 logger.info(f"WebSocket response sent successfully")
                 
@@ -324,7 +347,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         manager.disconnect(session_id)
 
 # HTTP endpoints
-@app.post("/api/chat/process", response_model=ChatResponseAPI)
+@app.post("/api/chat/process")
 async def process_chat_message(request: ChatRequest):
     """Process a chat message through the complete pipeline"""
     
@@ -347,32 +370,54 @@ async def process_chat_message(request: ChatRequest):
         logger.info(f"   Routing decision: {response.routing_decision.route_type}")
         logger.info(f"   Quality score: {response.quality_score}")
         
-        # For calculator responses, ensure they bypass evaluation/compliance
+        # For calculator responses, ensure they bypass evaluation/compliance.
+        # Returned as a direct ORJSONResponse so FastAPI skips response-model
+        # validation and jsonable_encoder on the hot path
         if response.routing_decision.route_type == "QUICK_CALCULATOR":
             # Calculator responses get perfect scores and no disclaimers
-            final_response = ChatResponseAPI(
-                content=response.content,
-                quality_score=1.0,  # Perfect score for calculators
-                routing_decision=response.routing_decision.dict(),
-                disclaimers=[],  # No disclaimers for calculator responses
-                session_id=request.session_id
-            )
+            final_response = {
+                "content": response.content,
+                "quality_score": 1.0,  # Perfect score for calculators
+                "routing_decision": response.routing_decision.dict(),
+                "disclaimers": [],  # No disclaimers for calculator responses
+                "session_id": request.session_id
+            }
         else:
             # Regular responses go through normal processing
-            final_response = ChatResponseAPI(
-                content=response.content,
-                quality_score=response.quality_score,
-                routing_decision=response.routing_decision.dict(),
-                disclaimers=response.disclaimers,
-                session_id=request.session_id
-            )
-        
-        return final_response
+            final_response = {
+                "content": response.content,
+                "quality_score": response.quality_score,
+                "routing_decision": response.routing_decision.dict(),
+                "disclaimers": response.disclaimers,
+                "session_id": request.session_id
+            }
+
+        return ORJSONResponse(final_response)
         
     except Exception as e:
         logger.error(f"Error processing chat message: {e}")
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
+@app.post("/api/chat/stream")
+async def stream_chat_message(request: ChatRequest):
+    """Stream a chat response over Server-Sent Events for faster perceived TTFB"""
+
+    if not chatbot_orchestrator:
+        raise HTTPException(status_code=503, detail="Chatbot system is not available")
+
+    message = ChatMessage(
+        id=str(uuid.uuid4()),
+        type="user",
+        content=request.message,
+        timestamp=datetime.utcnow()
+    )
+
+    async def event_generator():
+        async for event in chatbot_orchestrator.process_message_stream(message, request.session_id):
+            yield b"data: " + orjson.dumps(event) + b"\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
 @app.post("/api/chat/file/upload")
 async def upload_file(
     file: UploadFile = File(...),
@@ -542,16 +587,16 @@ async def health_check():
                 "quick_calculator": "available",
                 "file_processor": "available"
             }
-        
-        return status
-        
+
+        return ORJSONResponse(status)
+
     except Exception as e:
         logger.error(f"Health check failed: {e}")
-        return {
+        return ORJSONResponse({
             "status": "unhealthy",
             "error": str(e),
             "timestamp": datetime.utcnow().isoformat()
-        }
+        })
 
 @app.get("/test-minimal")
 async def test_minimal():